@@ -0,0 +1,177 @@
+# --- START OF FILE api.py ---
+"""
+Read-only JSON API for the Bourbon Chasers standings, for tools that would otherwise scrape the dashboard
+(chat bot, TV display). Uses the same scoreboard.py load/preprocess/leaderboard logic as app.py.
+
+Every response carries an ETag and Cache-Control header, and a matching If-None-Match gets a bodyless 304,
+so polling clients cost almost nothing. Bodies are rendered once per data version (and per week or day where
+they depend on the calendar) and reused.
+
+Run with:  uvicorn api:app --port 8000
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+from starlette.applications import Starlette
+from starlette.responses import Response
+from starlette.routing import Route
+
+import scoreboard
+
+# --- Settings ---
+REFRESH_SECONDS = int(os.environ.get("SCOREBOARD_REFRESH_SECONDS", "300")) # Same 5 minutes as the dashboard cache
+CACHE_CONTROL = f"public, max-age=60, stale-while-revalidate={REFRESH_SECONDS}"
+
+
+# --- JSON Helpers ---
+def _to_json_value(value):
+    """json.dumps fallback for numpy scalars, dates and anything else pandas hands back."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+def _records(df):
+    """DataFrame -> list of plain dicts (NaN becomes null)."""
+    return json.loads(df.to_json(orient="records", date_format="iso"))
+
+
+# --- Scoreboard State ---
+class ScoreboardState:
+    """
+    Holds the latest scoreboard and the JSON bodies rendered from it. The workbook is reloaded at most once
+    per REFRESH_SECONDS, off the event loop; bodies are thrown away only when the data version changes.
+    """
+
+    def __init__(self):
+        self.weekly_data = None
+        self.data_version = None
+        self.leaderboard = None
+        self.loaded_at = 0.0
+        self.bodies = {}
+        self.lock = asyncio.Lock()
+
+    def _is_fresh(self):
+        return self.weekly_data is not None and time.monotonic() - self.loaded_at < REFRESH_SECONDS
+
+    async def refresh_if_stale(self):
+        if self._is_fresh():
+            return
+        async with self.lock:
+            if self._is_fresh(): # Another request refreshed while we waited
+                return
+            try:
+                weekly_data, _, _, data_version = await asyncio.to_thread(scoreboard.load_scoreboard, scoreboard.DATA_URL)
+            except Exception as e:
+                print(f"Scoreboard refresh failed: {e}")
+                if self.weekly_data is None:
+                    raise
+                self.loaded_at = time.monotonic() # Keep serving the last good copy until the next refresh
+                return
+            if data_version != self.data_version:
+                print(f"Scoreboard data version {self.data_version} -> {data_version}")
+                self.weekly_data = weekly_data
+                self.data_version = data_version
+                self.leaderboard = scoreboard.calculate_leaderboard(weekly_data.copy(), scoreboard.competition_total_weeks)
+                self.bodies = {}
+            self.loaded_at = time.monotonic()
+
+    def body(self, key, build_payload):
+        """Returns (body bytes, ETag) for key, building and caching the JSON once per data version."""
+        if key not in self.bodies:
+            payload = {"data_version": self.data_version, **build_payload()}
+            body = json.dumps(payload, default=_to_json_value).encode("utf-8")
+            self.bodies[key] = (body, f'"{hashlib.sha1(body).hexdigest()[:16]}"')
+        return self.bodies[key]
+
+state = ScoreboardState()
+
+
+# --- Payload Builders ---
+def get_current_week():
+    return scoreboard.get_competition_week(datetime.today().date())
+
+def build_leaderboard_payload(current_week):
+    return {"current_week": current_week, "leaderboard": _records(state.leaderboard)}
+
+def build_weeks_payload(current_week):
+    points_matrix = scoreboard.build_weekly_points_matrix(state.weekly_data, scoreboard.competition_total_weeks)
+    points_matrix.index = points_matrix.index.astype(str)
+    weeks = [
+        {"week": int(week), "group_points": float(points_matrix[week].sum()), "participant_points": points_matrix[week].to_dict()}
+        for week in points_matrix.columns
+    ]
+    return {"current_week": current_week, "weeks": weeks}
+
+def build_wtd_kpis_payload():
+    return scoreboard.calculate_wtd_kpis(state.weekly_data)
+
+def build_participants_payload():
+    return {"participants": _records(scoreboard.summarize_participants(state.weekly_data, state.leaderboard))}
+
+
+# --- Endpoints ---
+def cached_json_response(request, key, build_payload):
+    """Serves a cached body with ETag/Cache-Control headers, or a 304 when the client already has it."""
+    body, etag = state.body(key, build_payload)
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    client_etags = [tag.strip().removeprefix("W/") for tag in request.headers.get("if-none-match", "").split(",")]
+    if etag in client_etags or "*" in client_etags:
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+def error_response(status_code, message):
+    return Response(json.dumps({"error": message}), status_code=status_code, media_type="application/json", headers={"Cache-Control": "no-store"})
+
+async def ensure_loaded():
+    """Refreshes the scoreboard if stale; returns an error response if no data could be loaded at all."""
+    try:
+        await state.refresh_if_stale()
+    except Exception as e:
+        return error_response(503, f"Scoreboard data unavailable: {e}")
+    return None
+
+# Bodies that include current_week are cached per competition week too, so the week rolls over (with a new ETag)
+# even when the workbook hasn't changed
+async def leaderboard(request):
+    current_week = get_current_week()
+    return await ensure_loaded() or cached_json_response(request, ("leaderboard", current_week), lambda: build_leaderboard_payload(current_week))
+
+async def weeks(request):
+    current_week = get_current_week()
+    return await ensure_loaded() or cached_json_response(request, ("weeks", current_week), lambda: build_weeks_payload(current_week))
+
+async def wtd_kpis(request):
+    # WtD windows move with the calendar, so the body is cached per day as well as per data version
+    return await ensure_loaded() or cached_json_response(request, ("kpis/wtd", datetime.today().date()), build_wtd_kpis_payload)
+
+async def participants(request):
+    return await ensure_loaded() or cached_json_response(request, "participants", build_participants_payload)
+
+async def participant(request):
+    error = await ensure_loaded()
+    if error:
+        return error
+    name = request.path_params["name"]
+    participants_body, _ = state.body("participants", build_participants_payload)
+    match = [p for p in json.loads(participants_body)["participants"] if p["Participant"].lower() == name.lower()]
+    if not match:
+        return error_response(404, f"Unknown participant: {name}")
+    return cached_json_response(request, ("participants", match[0]["Participant"]), lambda: {"participant": match[0]})
+
+app = Starlette(routes=[
+    Route("/api/leaderboard", leaderboard),
+    Route("/api/weeks", weeks),
+    Route("/api/kpis/wtd", wtd_kpis),
+    Route("/api/participants", participants),
+    Route("/api/participants/{name}", participant),
+])
+
+# --- END OF FILE api.py ---
@@ -1,13 +1,26 @@
 # --- START OF FILE app.py ---
 
+import os
 import streamlit as st
 import pandas as pd
 import base64
-import plotly.express as px
-from datetime import datetime, timedelta # Ensure timedelta is imported
-import openpyxl
+from datetime import datetime
 import requests
-from io import BytesIO
+from scoreboard import (
+    DATA_URL, CANDIDATE_SCORING_RULES, DEFAULT_SCORING_RULES,
+    competition_total_weeks, week_dates, get_competition_week, get_competition_progress,
+    fetch_concurrently, parse_weekly_data, preprocess_data, compact_weekly_data, compute_data_version, rescore_history,
+    calculate_leaderboard, build_weekly_points_matrix, calculate_rank_history, calculate_head_to_head, project_final_standings,
+    summarize_running_totals, summarize_participant_totals, calculate_wtd_kpis, summarize_weekly_running_distance,
+    summarize_zone_comparison, summarize_cumulative_points, summarize_activity_breakdown,
+    TRAINING_LOAD_METRICS, TrainingLoadState, build_distribution_sketches, lookup_participant_distribution,
+)
+from export_scoreboard import export_workbook_bytes, build_export_tables
+from charts import (
+    build_rank_history_chart, build_runners_chart, build_weekly_miles_chart,
+    build_zone_comparison_chart, build_cumulative_points_chart, build_activity_pie, build_training_load_chart,
+    build_head_to_head_chart,
+)
 
 # --- Page Config (Keep at the top) ---
 st.set_page_config(
@@ -28,228 +41,64 @@ def get_base64_image(image_path):
         st.error(f"Error reading sidebar image file {image_path}: {e}")
         return ""
 
-def get_base64_image_from_url(image_url):
-    """Fetches an image from a URL and encodes it in base64."""
-    try:
-        response = requests.get(image_url, timeout=10) # Added timeout
-        response.raise_for_status() # Raises HTTPError for bad responses (4xx or 5xx)
-        if response.status_code == 200:
-            return base64.b64encode(response.content).decode()
-        else:
-            print(f"Error loading image from URL {image_url}: HTTP {response.status_code}")
-            return ""
-    except requests.exceptions.Timeout:
-        print(f"Timeout error fetching image from URL {image_url}")
-        return ""
-    except requests.exceptions.RequestException as e:
-        print(f"Network error fetching image from URL {image_url}: {e}")
-        return ""
-    except Exception as e:
-        print(f"Unexpected error fetching image from URL {image_url}: {e}")
-        return ""
+# --- Remote Resources ---
+# Override with SCOREBOARD_IMAGE_URL / SCOREBOARD_FONTS_URL (e.g. the load-test stub server)
+IMAGE_URL = os.environ.get("SCOREBOARD_IMAGE_URL", "https://raw.githubusercontent.com/Steven-Carter-Data/50k-Strava-Tracker/main/bg_smolder.png")
+FONTS_CSS_URL = os.environ.get("SCOREBOARD_FONTS_URL", "https://fonts.googleapis.com/css2?family=UnifrakturCook:wght@700&display=swap")
+
+def describe_fetch_error(url, error):
+    """User-facing message for a failed fetch."""
+    if isinstance(error, requests.exceptions.Timeout):
+        return f"Timeout error fetching {url}."
+    if isinstance(error, requests.exceptions.RequestException):
+        return f"Network error fetching {url}: {error}"
+    return f"Unexpected error fetching {url}: {error}"
+
+class WorkbookFetchError(Exception):
+    """Raised by fetch_remote_resources when the workbook can't be fetched; carries whatever else was fetched."""
+    def __init__(self, contents, errors):
+        super().__init__(errors["data"])
+        self.contents = contents
+        self.errors = errors
+
+@st.cache_data(ttl=300, show_spinner="Loading the latest scoreboard...") # Cache for 5 minutes, shared by every session and fragment
+def fetch_remote_resources(data_url, image_url, fonts_url):
+    """
+    Fetches the workbook, background image and font CSS concurrently over the pooled session, so a cold
+    start waits for the slowest fetch instead of all three in a row.
+    Returns ({name: content}, {name: error message}) for the names "data" (workbook bytes), "image"
+    (base64 string) and "fonts" (CSS text); a failed fetch appears only in the errors.
+    A failed workbook fetch raises WorkbookFetchError instead, so Streamlit doesn't cache it and the next rerun retries.
+    """
+    urls = {"data": data_url, "image": image_url, "fonts": fonts_url}
+    results = fetch_concurrently({"data": (data_url, 20), "image": (image_url, 10), "fonts": (fonts_url, 10)})
+    contents = {name: content for name, (content, error) in results.items() if error is None}
+    errors = {name: describe_fetch_error(urls[name], error) for name, (content, error) in results.items() if error is not None}
+    for message in errors.values():
+        print(message)
+    if "image" in contents:
+        contents["image"] = base64.b64encode(contents["image"]).decode()
+    if "fonts" in contents:
+        contents["fonts"] = contents["fonts"].decode("utf-8")
+    if "data" in errors:
+        raise WorkbookFetchError(contents, errors)
+    return contents, errors
 
 # --- Data Loading Function ---
-# @st.cache_data(ttl=300) # Consider re-enabling later for performance (cache for 5 minutes)
-def load_weekly_data(url):
-    """Loads the weekly scoreboard Excel file from a URL."""
-    print(f"Attempting to load data from: {url}")
-    try:
-        response = requests.get(url, timeout=20) # Added timeout
-        response.raise_for_status()
-        df = pd.read_excel(BytesIO(response.content), engine="openpyxl")
-        print(f"Data loaded successfully. Shape: {df.shape}")
-        print(f"Initial columns: {df.columns.tolist()}")
-        return df
-    except requests.exceptions.Timeout:
-        st.error(f"Timeout error fetching data file from {url}. Please try again later.")
-        return None
-    except requests.exceptions.RequestException as e:
-        st.error(f"Network error fetching data file from {url}: {e}")
+def load_weekly_data(content):
+    """Parses the downloaded scoreboard Excel file, reporting failures in the page."""
+    if content is None:
         return None
-    except Exception as e:
-        st.error(f"Failed to load or parse Excel file from {url}. Error: {e}")
-        return None
-
-# --- Data Preprocessing Function ---
-def preprocess_data(df):
-    """Cleans, processes, and prepares the weekly data DataFrame."""
-    if df is None or df.empty:
-        st.error("Cannot preprocess data: Input DataFrame is None or empty.")
-        # Return an empty DataFrame with expected columns to prevent downstream errors
-        expected_cols = ["Date", "Participant", "Workout Type", "Total Duration", "Total Distance",
-                         "Zone 1", "Zone 2", "Zone 3", "Zone 4", "Zone 5", "Points", "Week"]
-        return pd.DataFrame(columns=expected_cols)
-
-    print("Starting Data Preprocessing...")
-    processed_df = df.copy() # Work on a copy
-
-    # === Date Handling ===
-    if "Date" in processed_df.columns:
-        print("Processing 'Date' column...")
-        processed_df["Date"] = pd.to_datetime(processed_df["Date"], errors='coerce')
-        initial_rows = len(processed_df)
-        processed_df.dropna(subset=["Date"], inplace=True)
-        rows_dropped = initial_rows - len(processed_df)
-        if rows_dropped > 0:
-            print(f"Dropped {rows_dropped} rows due to invalid dates.")
-        # Sort by Date (most recent first) right after cleaning
-        processed_df = processed_df.sort_values(by="Date", ascending=False)
-        print("'Date' column processed and sorted.")
-    else:
-        print("Warning: 'Date' column not found.")
-        # Consider adding a placeholder or stopping if Date is crucial for your logic
-
-    # === Zone Handling ===
-    zone_cols = ["Zone 1", "Zone 2", "Zone 3", "Zone 4", "Zone 5"]
-    print("Processing Zone columns...")
-    for col in zone_cols:
-        if col not in processed_df.columns:
-            processed_df[col] = 0 # Add missing zone columns if necessary
-            print(f"Warning: Column '{col}' missing, added with zeros.")
-        else:
-            # Convert to numeric, coerce errors to NaN, then fill NaN with 0
-            processed_df[col] = pd.to_numeric(processed_df[col], errors='coerce').fillna(0)
-    print("Zone columns processed.")
-
-    # === Points Calculation ===
-    print("Calculating 'Points' column...")
-    # Calculate directly on the DataFrame (adds/updates 'Points' column at the end)
-    try:
-        processed_df["Points"] = (
-            processed_df["Zone 1"] * 1 + processed_df["Zone 2"] * 2 +
-            processed_df["Zone 3"] * 3 + processed_df["Zone 4"] * 4 +
-            processed_df["Zone 5"] * 5
-        )
-        print("'Points' column calculated.")
-    except Exception as e:
-        print(f"ERROR calculating 'Points' column: {e}. 'Points' column may be incorrect or missing.")
-        processed_df["Points"] = 0 # Set to 0 as a fallback if calculation fails
-
-    print(f"Columns AFTER Points calculation: {processed_df.columns.tolist()}") # DEBUG
-
-    # === Other Numeric Columns ===
-    numeric_cols = ["Total Distance", "Total Duration", "Week"]
-    print("Processing other numeric columns...")
-    for col in numeric_cols:
-         if col in processed_df.columns:
-              # Convert to numeric, coerce errors to NaN (will be handled later if needed, e.g., fillna(0) before sum)
-              processed_df[col] = pd.to_numeric(processed_df[col], errors='coerce')
-         else:
-              print(f"Warning: Numeric column '{col}' not found.")
-    print("Other numeric columns processed.")
-
-    # === ** COLUMN REORDERING LOGIC ** ===
-    # This section ensures 'Points' is positioned correctly after 'Zone 5' if both exist.
-    print("Attempting final column reordering...")
-    current_cols = processed_df.columns.tolist()
-    # Define the ideal start of the order
-    ideal_start_order = [
-        "Date", "Participant", "Workout Type", "Total Duration", "Total Distance",
-        "Zone 1", "Zone 2", "Zone 3", "Zone 4", "Zone 5", "Points", "Week"
-    ]
-    # Create the final list: start with ideal columns found, then add the rest
-    final_ordered_cols = [col for col in ideal_start_order if col in current_cols]
-    remaining_cols = [col for col in current_cols if col not in final_ordered_cols]
-    final_ordered_cols.extend(remaining_cols) # Add any other columns to the end
-
     try:
-        processed_df = processed_df[final_ordered_cols] # Reindex DataFrame with the new order
-        print(f"Columns successfully reordered: {processed_df.columns.tolist()}")
-    except KeyError as e:
-        print(f"KeyError during column reordering: {e}. This likely means a column in 'final_ordered_cols' doesn't exist in the DataFrame. Keeping previous order.")
-        # If reordering fails, keep the order from before this step
+        return parse_weekly_data(content)
     except Exception as e:
-        print(f"ERROR during column reordering: {e}. Keeping previous order.")
-        # If reordering fails for other reasons, keep the order
-    # === ** END OF COLUMN REORDERING LOGIC ** ===
-
-
-    print("Data preprocessing complete.")
-    return processed_df
+        st.error(f"Failed to load or parse Excel file from {DATA_URL}. Error: {e}")
+        return None
 
 # --- Competition Date & Week Calculation ---
-def get_current_competition_week(start_date_dt, total_weeks=8):
-    """
-    Calculates the current competition week number (1-total_weeks).
-    Handles competition starting on Sunday, Mar 10, 2025.
-    Week 1: Sun, Mar 10 -> Sun, Mar 17
-    Week 2: Mon, Mar 18 -> Sun, Mar 24
-    ... subsequent weeks run Monday-Sunday.
-    """
-    today = datetime.today().date()
-
-    # Ensure start_date is a date object
-    if isinstance(start_date_dt, datetime):
-        start_date = start_date_dt.date()
-    else:
-        start_date = start_date_dt # Assume it's already a date object
-
-    # If today is before the official start date, default to showing Week 1
-    if today < start_date:
-        # print("DEBUG: Today is before start date.") # Optional debug print
-        return 1
-
-    # Define the specific end date for Week 1 based on the known schedule
-    # This handles the irregular start week.
-    try:
-        # Explicitly define the end date of the first week - WITH CORRECTED YEAR
-        end_of_week_1 = datetime(2025, 3, 17).date()
-    except ValueError:
-        # Fallback if date is invalid (shouldn't happen for fixed date)
-        st.error("Error defining end_of_week_1. Please check the date.")
-        return 1 # Default to week 1 on error
-
-    if today <= end_of_week_1:
-        # If today is within Week 1 (inclusive of the end date)
-        # print(f"DEBUG: Today ({today}) <= end_of_week_1 ({end_of_week_1}). Returning Week 1.") # Optional debug print
-        return 1
-    else:
-        # If today is after Week 1 ended
-        # Calculate the start of Week 2 (the Monday after end_of_week_1)
-        start_of_week_2 = end_of_week_1 + timedelta(days=1) # Should be Mon, Mar 18, 2025
-
-        # Calculate how many full days have passed since the start of Week 2
-        days_since_start_of_week_2 = (today - start_of_week_2).days
-
-        # Calculate the week number:
-        # // 7 gives the number of *full* weeks completed since Week 2 started.
-        # Add 2 (1 for Week 1 which already passed + 1 because //7 is 0-indexed)
-        current_week_number = (days_since_start_of_week_2 // 7) + 2
-
-        # print(f"DEBUG: Today={today}, EndW1={end_of_week_1}, StartW2={start_of_week_2}, DaysSinceW2={days_since_start_of_week_2}, CalcWeek={current_week_number}") # Optional debug print
-
-        # Clamp the week number between 1 and the total duration
-        final_week = min(max(current_week_number, 1), total_weeks)
-        # print(f"DEBUG: Clamped Week: {final_week}") # Optional debug print
-        return final_week
-
-competition_start_datetime = datetime(2025, 3, 10)
-competition_total_weeks = 8
-
-# Calculate current week based on explicit date ranges
+# Calculate current week based on explicit date ranges (competition calendar lives in scoreboard.py)
 today_date = datetime.today().date()
-
-# Define date ranges for each week
-week_dates = [
-    (datetime(2025, 3, 10).date(), datetime(2025, 3, 17).date()),  # Week 1
-    (datetime(2025, 3, 18).date(), datetime(2025, 3, 24).date()),  # Week 2
-    (datetime(2025, 3, 25).date(), datetime(2025, 3, 31).date()),  # Week 3
-    (datetime(2025, 4, 1).date(), datetime(2025, 4, 7).date()),    # Week 4
-    (datetime(2025, 4, 8).date(), datetime(2025, 4, 14).date()),   # Week 5
-    (datetime(2025, 4, 15).date(), datetime(2025, 4, 21).date()),  # Week 6
-    (datetime(2025, 4, 22).date(), datetime(2025, 4, 28).date()),  # Week 7
-    (datetime(2025, 4, 29).date(), datetime(2025, 5, 5).date()),   # Week 8
-]
-
-# Find which week contains today's date
-current_week = 1  # Default to Week 1 if before competition start
-for week_num, (start_date, end_date) in enumerate(week_dates, 1):
-    if start_date <= today_date <= end_date:
-        current_week = week_num
-        break
-# If today is after the last week, use the last week
-if today_date > week_dates[-1][1]:
-    current_week = len(week_dates)
+current_week = get_competition_week(today_date)
 
 print(f"Current Competition Week Calculated by Date Check: {current_week}")
 
@@ -260,24 +109,97 @@ default_display_week = min(current_week + 1 if is_monday else current_week, comp
 print(f"Current Competition Week: {current_week}, Is Monday: {is_monday}, Default Display Week: {default_display_week}")
 
 # --- Load and Preprocess Data ---
-DATA_URL = "https://github.com/Steven-Carter-Data/50k-Strava-Tracker/blob/main/TieDye_Weekly_Scoreboard.xlsx?raw=true"
-raw_weekly_data = load_weekly_data(DATA_URL)
-weekly_data = preprocess_data(raw_weekly_data) # weekly_data is now the cleaned DataFrame
+try:
+    remote_resources, fetch_errors = fetch_remote_resources(DATA_URL, IMAGE_URL, FONTS_CSS_URL)
+except WorkbookFetchError as e:
+    remote_resources, fetch_errors = e.contents, e.errors
+if "data" in fetch_errors:
+    st.error(f"{fetch_errors['data']} Please try again later.")
+
+@st.cache_data(max_entries=4, show_spinner=False) # Keyed on the workbook bytes, so an unchanged download is not reprocessed
+def load_dataset(content):
+    """
+    Parses, preprocesses and compacts the scoreboard. Returns (weekly_data, memory_report, duplicate_report, data_version),
+    where data_version is a content hash that changes only when the scoreboard itself changes.
+    """
+    raw_weekly_data = load_weekly_data(content)
+    if raw_weekly_data is None or raw_weekly_data.empty:
+        st.error("Cannot preprocess data: Input DataFrame is None or empty.")
+    weekly_data, duplicate_report = preprocess_data(raw_weekly_data) # weekly_data is now the cleaned DataFrame
+    weekly_data, memory_report = compact_weekly_data(weekly_data) # Downcast dtypes to keep the footprint small
+    return weekly_data, memory_report, duplicate_report, compute_data_version(weekly_data)
+
+weekly_data, memory_report, duplicate_report, data_version = load_dataset(remote_resources.get("data"))
+
+# --- Memoized Analytics ---
+# Keyed by data_version (the DataFrame itself is passed with a leading underscore so Streamlit doesn't hash it),
+# so each result is computed once per scoreboard version and only when a tab actually asks for it.
+@st.cache_data(max_entries=8, show_spinner=False)
+def get_leaderboard(data_version, _data, total_weeks):
+    return calculate_leaderboard(_data.copy(), total_weeks)
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def get_weekly_points_matrix(data_version, _data, total_weeks):
+    return build_weekly_points_matrix(_data, total_weeks)
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def get_scoring_comparison(data_version, _data):
+    return rescore_history(_data, CANDIDATE_SCORING_RULES)
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def get_head_to_head(data_version, _points_matrix, weeks_shown):
+    return calculate_head_to_head(_points_matrix)
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def get_standings_projection(data_version, _points_matrix, weeks_completed, weeks_remaining):
+    return project_final_standings(_points_matrix, weeks_completed, weeks_remaining, seed=0)
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def get_running_totals(data_version, _data):
+    return summarize_running_totals(_data)
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def get_participant_totals(data_version, _data):
+    return summarize_participant_totals(_data)
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def get_wtd_kpis(data_version, _data, today):
+    return calculate_wtd_kpis(_data, today)
+
+@st.cache_data(max_entries=2, show_spinner="Building the export...")
+def get_export_files(data_version, _data):
+    """Workbook bytes and activity-log CSV for the admin downloads, built once per data version."""
+    return export_workbook_bytes(_data), build_export_tables(_data)["Activity Log"].to_csv(index=False).encode("utf-8")
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def get_distribution_sketches(data_version, _data):
+    return build_distribution_sketches(_data)
+
+@st.cache_resource(show_spinner=False)
+def get_training_load_state(value_col):
+    """One long-lived TrainingLoadState per metric, shared by all sessions and updated incrementally per data version."""
+    return TrainingLoadState(value_col)
+
+def get_training_load(data_version, data, value_col):
+    training_load = get_training_load_state(value_col)
+    training_load.update(data, data_version)
+    return training_load
 
 # --- Styling ---
 # Background Image
-IMAGE_URL = "https://raw.githubusercontent.com/Steven-Carter-Data/50k-Strava-Tracker/main/bg_smolder.png"
-base64_image = get_base64_image_from_url(IMAGE_URL)
+base64_image = remote_resources.get("image", "")
 if base64_image:
     st.markdown(f"""<style>.stApp {{ background: url('data:image/png;base64,{base64_image}') no-repeat center center fixed !important; background-size: cover !important; background-position: center !important; }}</style>""", unsafe_allow_html=True)
 else:
     st.warning("Background image failed to load. Using default background.")
 
-# Custom Fonts and Element Styles
+# Custom Fonts (inlined from the concurrent fetch; fall back to letting the browser import it)
+fonts_css = remote_resources.get("fonts", f"@import url('{FONTS_CSS_URL}');")
+st.markdown(f"<style>{fonts_css}</style>", unsafe_allow_html=True)
+
+# Element Styles
 st.markdown("""
     <style>
-    @import url('https://fonts.googleapis.com/css2?family=UnifrakturCook:wght@700&display=swap');
-
     /* Global Font and Color */
     .stApp, .stApp h1, .stApp h2, .stApp h3, .stApp h4, .stApp h5, .stApp h6,
     .stApp .stMarkdown, .stApp .stDataFrame > div, .stApp .stMetric, .stApp .stTabs,
@@ -311,6 +233,17 @@ st.markdown("""
         background-color: rgba(212, 175, 55, 0.8); /* Semi-transparent gold */
         color: #000000 !important; /* Black text for selected tab */
     }}
+    /* Lazy tab navigation (the "active_tab" radio) styled like the tabs above */
+    .st-key-active_tab [data-testid="stRadioGroup"] {{ gap: 24px; }}
+    .st-key-active_tab [data-testid="stRadioOption"] {{
+        background-color: rgba(51, 51, 51, 0.7); border-radius: 4px 4px 0px 0px; padding: 10px 16px;
+        color: #D4AF37 !important; font-family: 'UnifrakturCook', serif !important;
+    }}
+    .st-key-active_tab [data-testid="stRadioOption"] p {{ color: inherit !important; font-family: inherit !important; }}
+    .st-key-active_tab [data-testid="stRadioOption"][data-selected],
+    .st-key-active_tab [data-testid="stRadioOption"]:has(input:checked) {{
+        background-color: rgba(212, 175, 55, 0.8); color: #000000 !important;
+    }}
 
     /* Dataframe */
     .stDataFrame {{
@@ -441,14 +374,62 @@ else:
     # Add a debug print here too, in case the data load is the issue
     print("DEBUG: weekly_data is None or empty, filters unavailable.")
 
+# --- Admin View (open the app with ?admin=1) ---
+show_admin_view = st.query_params.get("admin", "0") == "1"
+if show_admin_view:
+    with sidebar.expander("🛠️ Admin: Memory Footprint", expanded=False):
+        if memory_report is not None and not memory_report.empty:
+            total_row = memory_report.iloc[-1]
+            st.caption(f"weekly_data: {total_row['Bytes Before'] / 1024:,.1f} KB before compaction, {total_row['Bytes After'] / 1024:,.1f} KB after.")
+            st.dataframe(memory_report, use_container_width=True, hide_index=True)
+        else:
+            st.caption("No data loaded, nothing to report.")
+    with sidebar.expander("🛠️ Admin: Export Scoreboard", expanded=False):
+        if weekly_data is not None and not weekly_data.empty:
+            st.caption("Processed activity log, leaderboard with Week N Totals and one sheet per participant. For CSV/Parquet or large histories use `python export_scoreboard.py`.")
+            try:
+                if st.button("Prepare export", key="admin_prepare_export"):
+                    st.session_state["admin_export_ready"] = True
+                if st.session_state.get("admin_export_ready"):
+                    workbook_bytes, activity_log_csv = get_export_files(data_version, weekly_data)
+                    st.download_button("Download workbook (.xlsx)", workbook_bytes, file_name=f"TieDye_Weekly_Scoreboard_{data_version}.xlsx",
+                                       mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+                    st.download_button("Download activity log (.csv)", activity_log_csv, file_name=f"activity_log_{data_version}.csv", mime="text/csv")
+            except Exception as e:
+                st.error(f"Error building the export: {e}")
+        else:
+            st.caption("No data loaded, nothing to export.")
+    with sidebar.expander("🛠️ Admin: Duplicate Activities", expanded=False):
+        if duplicate_report is not None and not duplicate_report.empty:
+            exact_count = int((duplicate_report["Duplicate Type"] == "exact").sum())
+            st.markdown(f"**{exact_count}** exact duplicates were dropped before scoring. **{len(duplicate_report) - exact_count}** near-duplicates (same participant, day and workout type with matching duration, distance, elevation and zones) are kept and listed for review. **Row** and **Duplicate Of** are Excel row numbers in the workbook, so each flagged row can be checked against the one it matches.")
+            st.dataframe(duplicate_report, use_container_width=True, hide_index=True)
+        else:
+            st.caption("No duplicate activities found.")
+    with st.expander("🛠️ Admin: Scoring Rule Comparison", expanded=False):
+        st.markdown("Full-history standings rescored under each candidate rule set (`CANDIDATE_SCORING_RULES`), computed as one weights-matrix multiply over every activity's zone minutes.")
+        try:
+            scoring_comparison = get_scoring_comparison(data_version, weekly_data)
+            if not scoring_comparison.empty:
+                st.dataframe(scoring_comparison, use_container_width=True, hide_index=True)
+            else:
+                st.caption("No data loaded, nothing to compare.")
+        except Exception as e:
+            st.error(f"Error rescoring history under candidate rule sets: {e}")
+
 
 # --- Main App Tabs ---
-tabs = st.tabs(["Leaderboards", "Overview", "Individual Analysis"])
+LAZY_TAB_NAVIGATION = True # True: render only the selected tab. False: classic st.tabs, which renders every tab on each rerun
+# Each tab is a fragment: widgets inside a tab rerun only that tab against the cached dataset,
+# instead of re-running the download, preprocessing and every other tab's charts.
 
 # ===========================
 # ======= LEADERBOARDS TAB =======
 # ===========================
-with tabs[0]:
+@st.fragment
+def render_leaderboards_tab(selected_participant_sb, selected_week_str_sb):
+    """Renders the Leaderboards tab (activity log filtered by the sidebar selections, standings and group trends)."""
+    today_date = datetime.today().date()
     st.header("Leaderboards & Group Trends")
 
     # Check again if data is available AFTER preprocessing
@@ -502,48 +483,10 @@ with tabs[0]:
 
 
         # --- Competition Leaderboard ---
-        def calculate_leaderboard(data, total_weeks):
-            """Calculates the main competition leaderboard."""
-            required_cols = ["Participant", "Points", "Week"]
-            if data is None or data.empty or not all(c in data.columns for c in required_cols):
-                 st.warning(f"Leaderboard calculation skipped: Missing required columns {required_cols}")
-                 return pd.DataFrame(columns=["Rank", "Participant", "Points", "Points Behind"])
-
-            # Ensure Points is numeric before grouping
-            data['Points'] = pd.to_numeric(data['Points'], errors='coerce').fillna(0)
-            leaderboard = data.groupby("Participant")["Points"].sum().reset_index().sort_values(by="Points", ascending=False)
-
-            if not leaderboard.empty:
-                max_points = leaderboard["Points"].iloc[0]
-                leaderboard["Points Behind"] = max_points - leaderboard["Points"]
-            else:
-                leaderboard["Points Behind"] = 0 # Handle empty leaderboard case
-
-            leaderboard.reset_index(drop=True, inplace=True)
-            leaderboard.insert(0, 'Rank', leaderboard.index + 1)
-
-            # Move 'Points Behind' column
-            if "Points Behind" in leaderboard.columns:
-                try:
-                    points_idx = leaderboard.columns.get_loc("Points")
-                    points_behind_col = leaderboard.pop("Points Behind")
-                    leaderboard.insert(points_idx + 1, "Points Behind", points_behind_col)
-                except Exception as e:
-                     print(f"Error moving 'Points Behind' column: {e}") # Log error, continue
-
-            # Add weekly totals
-            data['Week'] = pd.to_numeric(data['Week'], errors='coerce') # Ensure Week is numeric
-            for week_num in range(1, total_weeks + 1):
-                # Ensure points are numeric before summing for the week
-                week_data = data[data["Week"] == week_num].copy()
-                week_data['Points'] = pd.to_numeric(week_data['Points'], errors='coerce').fillna(0)
-                week_points = week_data.groupby("Participant")["Points"].sum()
-                leaderboard[f"Week {week_num} Totals"] = leaderboard["Participant"].map(week_points).fillna(0).astype(int)
-
-            return leaderboard
-
         # competition_total_weeks is defined earlier
-        leaderboard_df = calculate_leaderboard(weekly_data.copy(), competition_total_weeks) # Use a copy of the cleaned data
+        leaderboard_df = get_leaderboard(data_version, weekly_data, competition_total_weeks) # st.cache_data hands back a fresh copy
+        if leaderboard_df.empty:
+            st.warning("Leaderboard calculation skipped: Missing required columns ['Participant', 'Points', 'Week']")
         st.subheader("Strava Competition Leaderboard")
         st.markdown("Overall ranking based on **cumulative points** earned from HR Zones across all activities and weeks. Also shows points behind the leader and a breakdown of points earned each week.")
         st.dataframe(leaderboard_df, use_container_width=True, hide_index=True)
@@ -573,76 +516,90 @@ with tabs[0]:
              st.info("Leaderboard data is empty or competition is in Week 1 (no previous week for comparison yet).")
 
 
+        # --- Projected Final Standings ---
+        st.subheader("🔮 Projected Final Standings")
+        st.markdown("Simulates the **remaining weeks** of the competition 20,000 times, drawing each participant's weekly points from their own average and spread (blended with the group's spread while there are only a few weeks to go on), then reports how often each participant finishes **first** and their **expected final rank**.")
+        required_cols_proj = ["Participant", "Points", "Week"]
+        if all(c in weekly_data.columns for c in required_cols_proj):
+            try:
+                # Work out how much of the competition is left, counting the unfinished part of the current week
+                weeks_completed, weeks_remaining = get_competition_progress(today_date)
+
+                if weeks_completed == 0:
+                    st.info("Projections become available once Week 1 is complete.")
+                else:
+                    points_matrix = get_weekly_points_matrix(data_version, weekly_data, competition_total_weeks)
+                    projection_df = get_standings_projection(data_version, points_matrix, weeks_completed, weeks_remaining)
+                    if weeks_remaining <= 0:
+                        st.caption("The competition is complete, so the projection matches the final standings.")
+                    st.dataframe(
+                        projection_df, use_container_width=True, hide_index=True,
+                        column_config={
+                            "Win Probability": st.column_config.NumberColumn(format="%.1f%%"),
+                            "Expected Final Rank": st.column_config.NumberColumn(format="%.2f"),
+                        }
+                    )
+            except Exception as e:
+                st.error(f"Error projecting final standings: {e}")
+        else:
+            st.warning(f"Cannot project final standings: Missing one or more required columns ({required_cols_proj})")
+
+
+        # --- Rank History ---
+        st.subheader("📈 Rank History")
+        st.markdown("Tracks each participant's **overall rank at the end of every week** based on cumulative points, showing who climbed and who slipped as the competition unfolded.")
+        required_cols_ranks = ["Participant", "Points", "Week"]
+        if all(c in weekly_data.columns for c in required_cols_ranks):
+            try:
+                # Only weeks that have started; later weeks would just repeat the latest standings
+                weeks_to_show = min(current_week, competition_total_weeks) if today_date >= week_dates[0][0] else 0
+                points_matrix = get_weekly_points_matrix(data_version, weekly_data, competition_total_weeks).iloc[:, :weeks_to_show]
+                if points_matrix.empty:
+                    st.info("Rank history becomes available once Week 1 has started.")
+                else:
+                    rank_history, cumulative_points = calculate_rank_history(points_matrix)
+                    fig_bump = build_rank_history_chart(rank_history, cumulative_points)
+                    st.plotly_chart(fig_bump, use_container_width=True)
+
+                    # Table sorted by the latest standings
+                    rank_history_table = rank_history.sort_values(by=rank_history.columns[-1])
+                    rank_history_table.columns = [f"Week {w} Rank" for w in rank_history_table.columns]
+                    rank_history_table.index = rank_history_table.index.astype(str)
+                    st.dataframe(rank_history_table.rename_axis("Participant").reset_index(), use_container_width=True, hide_index=True)
+            except Exception as e:
+                st.error(f"Error calculating rank history: {e}")
+        else:
+            st.warning(f"Cannot calculate rank history: Missing one or more required columns ({required_cols_ranks})")
+
+
+        # --- Head-to-Head ---
+        st.subheader("⚔️ Head-to-Head")
+        st.markdown("For every pair of Bourbon Chasers, how many **weeks the row participant out-scored the column participant**. Hover a cell for the losses and the **cumulative point margin**.")
+        if all(c in weekly_data.columns for c in required_cols_ranks):
+            try:
+                weeks_to_show = min(current_week, competition_total_weeks) if today_date >= week_dates[0][0] else 0
+                points_matrix = get_weekly_points_matrix(data_version, weekly_data, competition_total_weeks).iloc[:, :weeks_to_show]
+                if points_matrix.empty:
+                    st.info("Head-to-head records become available once Week 1 has started.")
+                else:
+                    weeks_won, point_margin = get_head_to_head(data_version, points_matrix, weeks_to_show)
+                    st.plotly_chart(build_head_to_head_chart(weeks_won, point_margin), use_container_width=True)
+            except Exception as e:
+                st.error(f"Error calculating head-to-head records: {e}")
+        else:
+            st.warning(f"Cannot calculate head-to-head records: Missing one or more required columns ({required_cols_ranks})")
+
+
         # --- Top Runners Visualization ---
         st.subheader("Top Runners by Distance and Duration")
         st.markdown("Compares participants based on their **total accumulated running distance** and **total running duration** throughout the competition. Average pace for runs is shown on the distance bars.")
         required_run_cols = ["Total Distance", "Workout Type", "Total Duration", "Participant"]
         if all(col in weekly_data.columns for col in required_run_cols):
-            run_data = weekly_data[weekly_data["Workout Type"].str.contains("Run", case=False, na=False)].copy()
-            # Ensure required columns are numeric BEFORE filtering/grouping
-            run_data["Total Distance"] = pd.to_numeric(run_data["Total Distance"], errors='coerce').fillna(0)
-            run_data["Total Duration"] = pd.to_numeric(run_data["Total Duration"], errors='coerce').fillna(0)
+            melted_data = get_running_totals(data_version, weekly_data)
 
-            if not run_data.empty:
+            if not melted_data.empty:
                 try:
-                    distance_data = run_data.groupby("Participant")["Total Distance"].sum().reset_index()
-                    duration_data = run_data.groupby("Participant")["Total Duration"].sum().reset_index()
-                    combined_data = pd.merge(distance_data, duration_data, on="Participant", how="left") # Keep all participants with distance
-
-                    # Calculate Pace safely
-                    combined_data["Pace_Value"] = combined_data.apply(
-                        lambda row: row["Total Duration"] / row["Total Distance"] if row["Total Distance"] > 0 else 0, axis=1
-                    )
-                    combined_data["Pace_Text"] = combined_data["Pace_Value"].apply(
-                        lambda x: f"{int(x)}:{int((x % 1) * 60):02d} min/mi" if x > 0 else "N/A"
-                    )
-
-                    combined_data = combined_data.sort_values(by="Total Distance", ascending=True) # Ascending for horizontal bar chart
-
-                    # Prepare data for Plotly (melt)
-                    melted_data = combined_data.melt(
-                        id_vars=["Participant", "Pace_Text"],
-                        value_vars=["Total Distance", "Total Duration"],
-                        var_name="Metric", value_name="Value"
-                    )
-                    # Create display columns
-                    melted_data['Display Value'] = melted_data.apply(lambda row: row['Value'] / 60 if row['Metric'] == 'Total Duration' else row['Value'], axis=1)
-                    melted_data['Metric Label'] = melted_data['Metric'].replace({"Total Distance": "Distance (miles)", "Total Duration": "Duration (hours)"})
-
-                    # Create the bar chart - SIMPLIFIED HOVER
-                    fig_runners = px.bar(
-                        melted_data, x="Display Value", y="Participant", color="Metric Label", orientation="h",
-                        color_discrete_map={"Distance (miles)": "#E25822", "Duration (hours)": "#FFD700"}, template="plotly_dark",
-                        hover_name="Participant"  # Just use hover_name, no hover_data
-                    )
-                    
-                    # Add custom hover templates based on metric type
-                    for i, d in enumerate(fig_runners.data):
-                        if "Distance" in d.name:
-                            # Format for distance bars
-                            fig_runners.data[i].hovertemplate = '%{y}<br>Distance: %{x:.2f} miles<br>Pace: %{customdata[0]}<extra></extra>'
-                        else:
-                            # Format for duration bars
-                            fig_runners.data[i].hovertemplate = '%{y}<br>Duration: %{x:.2f} hours<extra></extra>'
-                    
-                    # Add custom data for hover
-                    fig_runners.update_traces(
-                        customdata=melted_data[['Pace_Text']],
-                        selector=dict(type='bar')
-                    )
-                    
-                    # Add text labels
-                    text_labels = melted_data.apply(
-                        lambda row: row['Pace_Text'] if row['Metric Label'] == 'Distance (miles)' else f"{row['Display Value']:.1f} hrs", 
-                        axis=1
-                    )
-                    fig_runners.update_traces(text=text_labels, textposition='auto', selector=dict(type='bar'))
-                    
-                    # Update layout
-                    fig_runners.update_layout(
-                        title=dict(text="Total Running Distance & Duration by Bourbon Chaser", x=0.01, xanchor="left", font=dict(size=20, family='UnifrakturCook, serif', color='#D4AF37')),
-                        xaxis_title="Value (Miles or Hours)", yaxis_title="Participant", legend_title_text="Metric", barmode='group', yaxis={'categoryorder':'total ascending'}
-                    )
+                    fig_runners = build_runners_chart(melted_data)
                     st.plotly_chart(fig_runners, use_container_width=True)
                 except Exception as e:
                     st.error(f"An error occurred while creating the runners chart: {e}")
@@ -652,63 +609,35 @@ with tabs[0]:
             st.warning(f"Cannot create runners chart: Missing one or more required columns ({required_run_cols})")
 
 
+        # All three Week-to-Date KPIs come from the shared scoreboard logic (memoized per data version and day)
+        wtd_kpis = get_wtd_kpis(data_version, weekly_data, today_date)
+
         # --- Group Weekly Running Distance Progress & KPI ---
         st.subheader("Group Weekly Running Distance Progress")
         st.markdown("Tracks the **total distance run by the entire group** each week and compares Week-to-Date (WtD) progress against the previous week.")
         required_group_run_cols = ["Week", "Total Distance", "Workout Type", "Date"] # Date needed for KPI
         if all(col in weekly_data.columns for col in required_group_run_cols):
-             running_data_group = weekly_data[weekly_data["Workout Type"].str.contains("Run", case=False, na=False)].copy()
-             # Ensure data types are correct before proceeding
-             running_data_group['Week'] = pd.to_numeric(running_data_group['Week'], errors='coerce')
-             running_data_group['Total Distance'] = pd.to_numeric(running_data_group['Total Distance'], errors='coerce').fillna(0)
-             running_data_group['Date'] = pd.to_datetime(running_data_group['Date'], errors='coerce')
-             running_data_group.dropna(subset=['Week', 'Date'], inplace=True) # Drop rows where Week or Date is invalid
-
-             if not running_data_group.empty:
+             weekly_distance = summarize_weekly_running_distance(weekly_data)
+
+             if not weekly_distance.empty:
                  # --- Weekly Line Chart ---
                  try:
-                     weekly_distance = running_data_group.groupby("Week")["Total Distance"].sum().reset_index().sort_values("Week")
-                     fig_weekly_miles = px.line( weekly_distance, x="Week", y="Total Distance", markers=True, labels={"Total Distance": "Total Distance (Miles)", "Week": "Competition Week"}, template="plotly_dark")
-                     fig_weekly_miles.update_layout( title=dict(text="Total Group Miles Run by Week", x=0.01, xanchor='left', font=dict(family='UnifrakturCook, serif', color='#D4AF37')), yaxis_title="Total Distance (Miles)")
-                     fig_weekly_miles.update_traces(line=dict(color='#E25822'))
+                     fig_weekly_miles = build_weekly_miles_chart(weekly_distance)
                      st.plotly_chart(fig_weekly_miles, use_container_width=True)
                  except Exception as e:
                      st.error(f"Error creating weekly distance chart: {e}")
 
                  # --- Week-to-Date Running Distance KPI ---
                  try:
-                     today_date = datetime.today().date(); start_date_dt = competition_start_datetime.date()
-                     if today_date >= start_date_dt:
-                         # Calculate current competition week number based on Mon-Sun cycle
-                         current_week_num_for_calc = get_current_competition_week(start_date_dt, competition_total_weeks)
-                         # Calculate date ranges relative to Mon-Sun weeks
-                         start_weekday = start_date_dt.weekday() # Mon=0, Sun=6
-                         monday_of_start_week = start_date_dt - timedelta(days=start_weekday)
-                         # Monday of the current week
-                         today_weekday = today_date.weekday()
-                         monday_of_current_week = today_date - timedelta(days=today_weekday)
-                         # Calculate start/end dates for current and previous WtD periods
-                         days_into_current_week = (today_date - monday_of_current_week).days
-                         current_period_end_dt = today_date
-                         current_week_start_dt = monday_of_current_week
-                         prev_week_monday = monday_of_current_week - timedelta(weeks=1)
-                         prev_period_end_dt = prev_week_monday + timedelta(days=days_into_current_week)
-                         prev_week_start_dt = prev_week_monday # The start of the previous week is its Monday
-
-                         # Sum distances within ranges
-                         current_week_distance = running_data_group[ (running_data_group["Date"].dt.date >= current_week_start_dt) & (running_data_group["Date"].dt.date <= current_period_end_dt) ]["Total Distance"].sum()
-                         prev_week_distance = running_data_group[ (running_data_group["Date"].dt.date >= prev_week_start_dt) & (running_data_group["Date"].dt.date <= prev_period_end_dt) ]["Total Distance"].sum()
-                         # Calculate percentage change safely
-                         if prev_week_distance > 0: pct_change_distance = ((current_week_distance - prev_week_distance) / prev_week_distance) * 100
-                         elif current_week_distance > 0: pct_change_distance = 100.0 # Indicate increase from zero
-                         else: pct_change_distance = 0.0 # No change if both zero
+                     distance_kpi = wtd_kpis["running_distance"]
+                     if wtd_kpis["started"]:
                          # Determine color and arrow
-                         kpi_color = "#00FF00" if pct_change_distance >= 0 else "#FF4136"; kpi_arrow = "🔼" if pct_change_distance >= 0 else "🔽"
+                         kpi_color = "#00FF00" if distance_kpi["pct_change"] >= 0 else "#FF4136"; kpi_arrow = "🔼" if distance_kpi["pct_change"] >= 0 else "🔽"
                          # Display KPI using styled div
                          st.markdown( f"""<div class='kpi-div'>
                                           <span class='kpi-title'>WtD Running Distance vs Prev. Week:</span><br>
-                                          <span class='kpi-value' style='color:{kpi_color};'>{pct_change_distance:.1f}% {kpi_arrow}</span><br>
-                                          <span class='kpi-context'>(Current: {current_week_distance:.1f} mi | Previous: {prev_week_distance:.1f} mi)</span>
+                                          <span class='kpi-value' style='color:{kpi_color};'>{distance_kpi["pct_change"]:.1f}% {kpi_arrow}</span><br>
+                                          <span class='kpi-context'>(Current: {distance_kpi["current"]:.1f} mi | Previous: {distance_kpi["previous"]:.1f} mi)</span>
                                          </div>""", unsafe_allow_html=True)
                      else:
                           st.info("Week-to-Date comparison starts after the competition begin date.")
@@ -724,48 +653,22 @@ with tabs[0]:
         # --- Group Activity Level Progress (WtD Count) ---
         st.subheader("Group Activity Count Progress (Week-to-Date)")
         st.markdown("Compares the **total number of activities** (all types) logged by the group **so far this week** against the count from the **same period last week**.")
-        if "Date" in weekly_data.columns:
-             weekly_data_kpi_act = weekly_data.copy()
-             weekly_data_kpi_act["Date"] = pd.to_datetime(weekly_data_kpi_act["Date"], errors='coerce')
-             weekly_data_kpi_act.dropna(subset=["Date"], inplace=True) # Need valid dates
-
-             if not weekly_data_kpi_act.empty:
-                 try:
-                     today_date = datetime.today().date(); start_date_dt = competition_start_datetime.date()
-                     if today_date >= start_date_dt:
-                         # Use same date range logic as Running Distance KPI (Mon-Sun weeks)
-                         start_weekday = start_date_dt.weekday()
-                         monday_of_start_week = start_date_dt - timedelta(days=start_weekday)
-                         today_weekday = today_date.weekday()
-                         monday_of_current_week = today_date - timedelta(days=today_weekday)
-                         days_into_current_week = (today_date - monday_of_current_week).days
-                         current_period_end_dt = today_date
-                         current_week_start_dt = monday_of_current_week
-                         prev_week_monday = monday_of_current_week - timedelta(weeks=1)
-                         prev_period_end_dt = prev_week_monday + timedelta(days=days_into_current_week)
-                         prev_week_start_dt = prev_week_monday
-
-                         # Count activities within ranges
-                         current_week_activity_count = weekly_data_kpi_act[ (weekly_data_kpi_act["Date"].dt.date >= current_week_start_dt) & (weekly_data_kpi_act["Date"].dt.date <= current_period_end_dt) ].shape[0]
-                         prev_week_activity_count = weekly_data_kpi_act[ (weekly_data_kpi_act["Date"].dt.date >= prev_week_start_dt) & (weekly_data_kpi_act["Date"].dt.date <= prev_period_end_dt) ].shape[0]
-                         # Calculate percentage change safely
-                         if prev_week_activity_count > 0: pct_change_activity = ((current_week_activity_count - prev_week_activity_count) / prev_week_activity_count) * 100
-                         elif current_week_activity_count > 0: pct_change_activity = 100.0
-                         else: pct_change_activity = 0.0
-                         # Determine color and arrow
-                         activity_color = "#00FF00" if pct_change_activity >= 0 else "#FF4136"; activity_arrow = "🔼" if pct_change_activity >= 0 else "🔽"
-                         # Display KPI
-                         st.markdown(f"""<div class='kpi-div'>
-                                           <span class='kpi-title'>WtD Activity Count vs Prev. Week:</span><br>
-                                           <span class='kpi-value' style='color:{activity_color};'>{pct_change_activity:.1f}% {activity_arrow}</span><br>
-                                           <span class='kpi-context'>(Current: {current_week_activity_count} | Previous: {prev_week_activity_count})</span>
-                                          </div>""", unsafe_allow_html=True)
-                     else:
-                          st.info("Week-to-Date comparison starts after the competition begin date.")
-                 except Exception as e:
-                     st.error(f"Error calculating WtD activity count KPI: {e}")
-             else:
-                 st.info("No valid activity data available for WtD Activity Count KPI.")
+        activity_kpi = wtd_kpis["activity_count"]
+        if activity_kpi is not None:
+             try:
+                 if wtd_kpis["started"]:
+                     # Determine color and arrow
+                     activity_color = "#00FF00" if activity_kpi["pct_change"] >= 0 else "#FF4136"; activity_arrow = "🔼" if activity_kpi["pct_change"] >= 0 else "🔽"
+                     # Display KPI
+                     st.markdown(f"""<div class='kpi-div'>
+                                       <span class='kpi-title'>WtD Activity Count vs Prev. Week:</span><br>
+                                       <span class='kpi-value' style='color:{activity_color};'>{activity_kpi["pct_change"]:.1f}% {activity_arrow}</span><br>
+                                       <span class='kpi-context'>(Current: {activity_kpi["current"]} | Previous: {activity_kpi["previous"]})</span>
+                                      </div>""", unsafe_allow_html=True)
+                 else:
+                      st.info("Week-to-Date comparison starts after the competition begin date.")
+             except Exception as e:
+                 st.error(f"Error calculating WtD activity count KPI: {e}")
         else:
              st.warning("Cannot calculate WtD Activity Count KPI: Missing 'Date' column.")
 
@@ -773,53 +676,24 @@ with tabs[0]:
         # --- Group Points Progress (WtD Points) ---
         st.subheader("Group Points Progress (Week-to-Date)")
         st.markdown("Compares the **total points earned** by the group **so far this week** against the points earned during the **same period last week**.")
-        required_cols_pts_kpi = ["Date", "Points"]
-        if all(c in weekly_data.columns for c in required_cols_pts_kpi):
-              weekly_data_kpi_pts = weekly_data.copy()
-              weekly_data_kpi_pts["Date"] = pd.to_datetime(weekly_data_kpi_pts["Date"], errors='coerce')
-              weekly_data_kpi_pts["Points"] = pd.to_numeric(weekly_data_kpi_pts["Points"], errors='coerce') # Ensure points is numeric
-              weekly_data_kpi_pts.dropna(subset=required_cols_pts_kpi, inplace=True) # Need valid date and points
-
-              if not weekly_data_kpi_pts.empty:
-                  try:
-                      today_date = datetime.today().date(); start_date_dt = competition_start_datetime.date()
-                      if today_date >= start_date_dt:
-                         # Use same date range logic as Running Distance KPI (Mon-Sun weeks)
-                         start_weekday = start_date_dt.weekday()
-                         monday_of_start_week = start_date_dt - timedelta(days=start_weekday)
-                         today_weekday = today_date.weekday()
-                         monday_of_current_week = today_date - timedelta(days=today_weekday)
-                         days_into_current_week = (today_date - monday_of_current_week).days
-                         current_period_end_dt = today_date
-                         current_week_start_dt = monday_of_current_week
-                         prev_week_monday = monday_of_current_week - timedelta(weeks=1)
-                         prev_period_end_dt = prev_week_monday + timedelta(days=days_into_current_week)
-                         prev_week_start_dt = prev_week_monday
-
-                         # Sum points within ranges
-                         current_week_points = weekly_data_kpi_pts[ (weekly_data_kpi_pts["Date"].dt.date >= current_week_start_dt) & (weekly_data_kpi_pts["Date"].dt.date <= current_period_end_dt) ]["Points"].sum()
-                         prev_week_points = weekly_data_kpi_pts[ (weekly_data_kpi_pts["Date"].dt.date >= prev_week_start_dt) & (weekly_data_kpi_pts["Date"].dt.date <= prev_period_end_dt) ]["Points"].sum()
-                         # Calculate percentage change
-                         if prev_week_points > 0: pct_change_points = ((current_week_points - prev_week_points) / prev_week_points) * 100
-                         elif current_week_points > 0: pct_change_points = 100.0
-                         else: pct_change_points = 0.0
-                         # Determine color and arrow
-                         points_kpi_color = "#00FF00" if pct_change_points >= 0 else "#FF4136"; points_kpi_arrow = "🔼" if pct_change_points >= 0 else "🔽"
-                         # Display KPI
-                         st.markdown(f"""<div class='kpi-div'>
-                                           <span class='kpi-title'>WtD Points Earned vs Prev. Week:</span><br>
-                                           <span class='kpi-value' style='color:{points_kpi_color};'>{pct_change_points:.1f}% {points_kpi_arrow}</span><br>
-                                           <span class='kpi-context'>(Current: {current_week_points:.0f} | Previous: {prev_week_points:.0f})</span>
-                                          </div>""", unsafe_allow_html=True)
-                      else:
-                         st.info("Week-to-Date comparison starts after the competition begin date.")
-                  except Exception as e:
-                     st.error(f"Error calculating WtD points KPI: {e}")
-
-              else:
-                 st.info("No valid data available for WtD Points KPI after cleaning.")
+        points_kpi = wtd_kpis["points"]
+        if points_kpi is not None:
+              try:
+                  if wtd_kpis["started"]:
+                     # Determine color and arrow
+                     points_kpi_color = "#00FF00" if points_kpi["pct_change"] >= 0 else "#FF4136"; points_kpi_arrow = "🔼" if points_kpi["pct_change"] >= 0 else "🔽"
+                     # Display KPI
+                     st.markdown(f"""<div class='kpi-div'>
+                                       <span class='kpi-title'>WtD Points Earned vs Prev. Week:</span><br>
+                                       <span class='kpi-value' style='color:{points_kpi_color};'>{points_kpi["pct_change"]:.1f}% {points_kpi_arrow}</span><br>
+                                       <span class='kpi-context'>(Current: {points_kpi["current"]:.0f} | Previous: {points_kpi["previous"]:.0f})</span>
+                                      </div>""", unsafe_allow_html=True)
+                  else:
+                     st.info("Week-to-Date comparison starts after the competition begin date.")
+              except Exception as e:
+                 st.error(f"Error calculating WtD points KPI: {e}")
         else:
-             st.warning(f"Cannot calculate WtD Points KPI: Missing one or more required columns ({required_cols_pts_kpi})")
+             st.warning("Cannot calculate WtD Points KPI: Missing one or more required columns (['Date', 'Points'])")
 
     else: # weekly_data is None or empty
         st.warning("No weekly data available to display Leaderboards and Trends.")
@@ -828,10 +702,16 @@ with tabs[0]:
 # ===========================
 # ======= OVERVIEW TAB =======
 # ===========================
-with tabs[1]:
+@st.fragment
+def render_overview_tab():
+    """Renders the Overview tab (competition rules)."""
     st.header("Competition Overview")
-    # Keep your existing markdown description here
-    st.markdown("""
+    # Scoring bullets come from the active rule set so the rules text never drifts from the code
+    zone_weight_lines = "\n".join(
+        f"        - **{zone}:** {weight:g} point{'' if weight == 1 else 's'} per minute"
+        for zone, weight in DEFAULT_SCORING_RULES["zone_weights"].items()
+    )
+    st.markdown(f"""
         ### **Bourbon Chasers - The Descent into Madness**
         Welcome to the Inferno! Over the next **8 weeks** (starting March 10th, 2025), you will battle for supremacy using **Heart Rate (HR) Zones** from your activities to earn points.
         This scoring method aims to level the playing field across different types of endurance activities.
@@ -839,11 +719,7 @@ with tabs[1]:
         #### **Scoring System**
         Points are awarded based on **time spent in each HR Zone** per activity (in minutes):
 
-        - **Zone 1:** 1 point per minute
-        - **Zone 2:** 2 points per minute
-        - **Zone 3:** 3 points per minute
-        - **Zone 4:** 4 points per minute
-        - **Zone 5:** 5 points per minute
+{zone_weight_lines}
 
         #### **Accepted Activities**
         Earn points from any logged activity where Strava provides HR Zone data, including common ones like:
@@ -864,7 +740,9 @@ with tabs[1]:
 # =================================
 # ======= INDIVIDUAL ANALYSIS TAB =======
 # =================================
-with tabs[2]:
+@st.fragment
+def render_individual_analysis_tab():
+    """Renders the Individual Analysis tab. Switching participants reruns only this fragment."""
     st.header("Individual Performance Breakdown")
 
     # Check if data and participant column exist
@@ -887,15 +765,11 @@ with tabs[2]:
                  req_cols_kpi1 = ["Total Duration", "Participant"]
                  if all(c in individual_data.columns for c in req_cols_kpi1) and all(c in weekly_data.columns for c in req_cols_kpi1):
                      try:
-                         # Ensure duration is numeric for both individual and group
-                         individual_data['Total Duration'] = pd.to_numeric(individual_data['Total Duration'], errors='coerce').fillna(0)
-                         participant_total_time = individual_data["Total Duration"].sum()
-
-                         group_time_data = weekly_data.copy()
-                         group_time_data['Total Duration'] = pd.to_numeric(group_time_data['Total Duration'], errors='coerce').fillna(0)
-                         # Calculate group average safely
-                         group_totals = group_time_data.groupby("Participant")["Total Duration"].sum()
-                         group_avg_total_time = group_totals.mean() if not group_totals.empty else 0
+                         # Participant total, group average and percentile are lookups into the per-version sketches
+                         sketches = get_distribution_sketches(data_version, weekly_data)
+                         participant_total_time = sketches["values"].at[str(participant_selected_ind), "Total Duration"]
+                         group_avg_total_time = sketches["summary"].at["Total Duration", "Mean"]
+                         time_percentile = sketches["percentiles"].at[str(participant_selected_ind), "Total Duration"]
 
                          # Calculate percentage safely
                          if group_avg_total_time > 0: percent_of_group_avg = (participant_total_time / group_avg_total_time) * 100
@@ -905,13 +779,33 @@ with tabs[2]:
                          st.markdown(f"""<div class='kpi-div'>
                                             <span class='kpi-title'>Total Training Time vs. Group Average:</span><br>
                                             <span class='kpi-value' style='color:{kpi_color_ind};'>{percent_of_group_avg:.1f}% {performance_arrow_ind}</span><br>
-                                            <span class='kpi-context'>({participant_total_time:.0f} min vs Avg: {group_avg_total_time:.0f} min)</span>
+                                            <span class='kpi-context'>({participant_total_time:.0f} min vs Avg: {group_avg_total_time:.0f} min | Percentile: {time_percentile:.0f})</span>
                                            </div>""", unsafe_allow_html=True)
                      except Exception as e:
                          st.error(f"Error calculating time comparison KPI: {e}")
                  else:
                      st.warning(f"Cannot calculate Time KPI: Missing required columns ({req_cols_kpi1})")
 
+                 # --- Percentile Position in the Group ---
+                 st.subheader(f"Where {participant_selected_ind} Stands in the Group")
+                 st.markdown("Shows the participant's **percentile rank** (share of the group at or below them) for total time, each zone, points and running distance, next to the group's **median** and **middle 50%** range.")
+                 try:
+                     participant_distribution = lookup_participant_distribution(get_distribution_sketches(data_version, weekly_data), participant_selected_ind)
+                     if not participant_distribution.empty:
+                         st.dataframe(
+                             participant_distribution, use_container_width=True, hide_index=True,
+                             column_config={
+                                 "Value": st.column_config.NumberColumn(format="%.1f"),
+                                 "Percentile": st.column_config.ProgressColumn(format="%.0f", min_value=0, max_value=100),
+                                 "Group Median": st.column_config.NumberColumn(format="%.1f"),
+                                 "Group Mean": st.column_config.NumberColumn(format="%.1f"),
+                             },
+                         )
+                     else:
+                         st.info(f"No totals found for {participant_selected_ind}.")
+                 except Exception as e:
+                     st.error(f"Error calculating percentile positions: {e}")
+
                  # --- Individual Zone Distribution vs Group Average ---
                  st.subheader(f"{participant_selected_ind}'s Time in Zone vs. Group Average")
                  st.markdown("Compares the **total minutes spent in each Heart Rate Zone** by the selected participant against the average minutes spent in those zones by **all participants**.")
@@ -919,21 +813,9 @@ with tabs[2]:
                  req_cols_zones = zone_columns + ["Participant"]
                  if all(col in individual_data.columns for col in zone_columns) and all(col in weekly_data.columns for col in req_cols_zones):
                      try:
-                         # Ensure zones are numeric for individual
-                         for z_col in zone_columns: individual_data[z_col] = pd.to_numeric(individual_data[z_col], errors='coerce').fillna(0)
-                         participant_zones = individual_data[zone_columns].sum()
-
-                         # Ensure zones are numeric for group calculation
-                         group_zone_data = weekly_data.copy()
-                         for z_col in zone_columns: group_zone_data[z_col] = pd.to_numeric(group_zone_data[z_col], errors='coerce').fillna(0)
-                         # Calculate group average safely
-                         group_zone_totals = group_zone_data.groupby("Participant")[zone_columns].sum()
-                         group_avg_zones = group_zone_totals.mean() if not group_zone_totals.empty else pd.Series(0, index=zone_columns)
-
-                         zone_comparison_df = pd.DataFrame({ "Zone": zone_columns, f"{participant_selected_ind}": participant_zones.values, "Group Average": group_avg_zones.values }).fillna(0)
-
-                         fig_zone_comparison = px.bar( zone_comparison_df.melt(id_vars=["Zone"], var_name="Type", value_name="Minutes"), x="Zone", y="Minutes", color="Type", barmode="group", template="plotly_dark", color_discrete_map={f"{participant_selected_ind}": "#FFD700", "Group Average": "#AAAAAA"})
-                         fig_zone_comparison.update_layout( title=dict(text=f"{participant_selected_ind}'s Time per Zone vs. Group Average", x=0.01, xanchor='left', font=dict(family='UnifrakturCook, serif', color='#D4AF37')), yaxis_title="Total Minutes", xaxis_title="Heart Rate Zone", legend_title_text="")
+                         # Group average comes from the per-participant totals (memoized per data version)
+                         zone_comparison_df = summarize_zone_comparison(individual_data, get_participant_totals(data_version, weekly_data), participant_selected_ind)
+                         fig_zone_comparison = build_zone_comparison_chart(zone_comparison_df, participant_selected_ind)
                          st.plotly_chart(fig_zone_comparison, use_container_width=True)
                      except Exception as e:
                          st.error(f"Error creating zone comparison chart: {e}")
@@ -947,16 +829,9 @@ with tabs[2]:
                  req_cols_cumul = ["Week", "Points"]
                  if all(col in individual_data.columns for col in req_cols_cumul):
                     try:
-                        # Ensure numeric and handle NaNs
-                        individual_data['Week'] = pd.to_numeric(individual_data['Week'], errors='coerce')
-                        individual_data['Points'] = pd.to_numeric(individual_data['Points'], errors='coerce').fillna(0)
-                        individual_data.dropna(subset=['Week'], inplace=True) # Need valid week number
-
-                        if not individual_data.empty:
-                            ind_cum_points = individual_data.sort_values("Week").groupby("Week")["Points"].sum().cumsum().reset_index()
-                            fig_ind_cum_points = px.line( ind_cum_points, x="Week", y="Points", markers=True, template="plotly_dark", labels={"Points": "Cumulative Points", "Week": "Competition Week"})
-                            fig_ind_cum_points.update_layout( title=dict(text=f"{participant_selected_ind}'s Cumulative Points", x=0.01, xanchor='left', font=dict(family='UnifrakturCook, serif', color='#D4AF37')), yaxis_title="Cumulative Points")
-                            fig_ind_cum_points.update_traces(line=dict(color='#FFD700'))
+                        ind_cum_points = summarize_cumulative_points(individual_data)
+                        if not ind_cum_points.empty:
+                            fig_ind_cum_points = build_cumulative_points_chart(ind_cum_points, participant_selected_ind)
                             st.plotly_chart(fig_ind_cum_points, use_container_width=True)
                         else:
                             st.info(f"No valid weekly point data found for {participant_selected_ind} to plot cumulative trend.")
@@ -966,39 +841,54 @@ with tabs[2]:
                      st.warning(f"Cannot create cumulative points chart: Missing required columns ({req_cols_cumul})")
 
 
+                 # --- Training Load (Acute vs Chronic) ---
+                 st.subheader(f"{participant_selected_ind}'s Training Load")
+                 st.markdown("Tracks **daily training load** with a rolling **7-day acute** and **28-day chronic** average. The **acute:chronic ratio** shows whether recent training is ramping up faster than the participant is used to (roughly 0.8-1.3 is the commonly cited sweet spot; well above 1.5 is a sharp spike).")
+                 req_cols_load = ["Date", "Participant"] + list(TRAINING_LOAD_METRICS.values())
+                 if all(col in weekly_data.columns for col in req_cols_load):
+                     try:
+                         load_metric = st.radio("Load measured by", list(TRAINING_LOAD_METRICS), horizontal=True, key="ind_load_metric")
+                         training_load = get_training_load(data_version, weekly_data, TRAINING_LOAD_METRICS[load_metric])
+                         load_series = training_load.participant_series(participant_selected_ind)
+                         if not load_series.empty:
+                             latest_load = load_series.iloc[-1]
+                             latest_acwr = latest_load["ACWR"]
+                             if pd.notna(latest_acwr):
+                                 kpi_color_load = "#00FF00" if 0.8 <= latest_acwr <= 1.3 else "#FFD700" if latest_acwr < 1.5 else "#FF4136"
+                                 st.markdown(f"""<div class='kpi-div'>
+                                                    <span class='kpi-title'>Acute:Chronic Ratio on {latest_load["Date"]:%b %d}:</span><br>
+                                                    <span class='kpi-value' style='color:{kpi_color_load};'>{latest_acwr:.2f}</span><br>
+                                                    <span class='kpi-context'>(Acute: {latest_load["Acute Load"]:.0f}/day | Chronic: {latest_load["Chronic Load"]:.0f}/day)</span>
+                                                   </div>""", unsafe_allow_html=True)
+                             st.plotly_chart(build_training_load_chart(load_series, participant_selected_ind, load_metric), use_container_width=True)
+                         else:
+                             st.info(f"No dated activities found for {participant_selected_ind} to calculate training load.")
+                     except Exception as e:
+                         st.error(f"Error calculating training load: {e}")
+                 else:
+                     st.warning(f"Cannot calculate training load: Missing required columns ({req_cols_load})")
+
+
                  # --- Activity Type Breakdown ---
                  st.subheader(f"{participant_selected_ind}'s Activity Breakdown")
                  st.markdown("Illustrates how the participant's logged activities are distributed by **type**, based on both the **number of sessions** and the **total time spent**.")
                  req_cols_act = ["Workout Type", "Total Duration"]
                  if all(col in individual_data.columns for col in req_cols_act):
                      try:
+                         activity_counts, activity_duration = summarize_activity_breakdown(individual_data)
                          col1, col2 = st.columns(2)
                          # Count Chart
                          with col1:
                              st.markdown("##### By Number of Activities")
-                             # Handle potential NaN workout types
-                             activity_counts = individual_data['Workout Type'].dropna().value_counts().reset_index()
-                             activity_counts.columns = ['Workout Type', 'Count']
                              if not activity_counts.empty:
-                                 fig_act_count = px.pie(activity_counts, names='Workout Type', values='Count', template="plotly_dark", hole=0.3)
-                                 fig_act_count.update_traces(textposition='inside', textinfo='percent+label', marker=dict(line=dict(color='#000000', width=1)))
-                                 fig_act_count.update_layout(showlegend=False, title_text='By Count', title_x=0.5, title_font_family='UnifrakturCook, serif', title_font_color='#D4AF37')
-                                 st.plotly_chart(fig_act_count, use_container_width=True)
+                                 st.plotly_chart(build_activity_pie(activity_counts, 'Count', 'By Count'), use_container_width=True)
                              else:
                                  st.info("No activities with valid types found.")
                          # Duration Chart
                          with col2:
                              st.markdown("##### By Total Duration")
-                             individual_data['Total Duration'] = pd.to_numeric(individual_data['Total Duration'], errors='coerce').fillna(0)
-                             # Group by workout type after handling NaNs
-                             activity_duration = individual_data.dropna(subset=['Workout Type']).groupby('Workout Type')['Total Duration'].sum().reset_index()
-                             # Filter out zero duration activities if needed
-                             activity_duration = activity_duration[activity_duration['Total Duration'] > 0]
                              if not activity_duration.empty:
-                                 fig_act_dur = px.pie(activity_duration, names='Workout Type', values='Total Duration', template="plotly_dark", hole=0.3)
-                                 fig_act_dur.update_traces(textposition='inside', textinfo='percent+label', marker=dict(line=dict(color='#000000', width=1)))
-                                 fig_act_dur.update_layout(showlegend=False, title_text='By Duration (min)', title_x=0.5, title_font_family='UnifrakturCook, serif', title_font_color='#D4AF37')
-                                 st.plotly_chart(fig_act_dur, use_container_width=True)
+                                 st.plotly_chart(build_activity_pie(activity_duration, 'Total Duration', 'By Duration (min)'), use_container_width=True)
                              else:
                                   st.info("No activities with valid duration found.")
                      except Exception as e:
@@ -1010,6 +900,21 @@ with tabs[2]:
          st.warning("Weekly data is unavailable or missing 'Participant' column, cannot display individual analysis.")
 
 
+tab_renderers = {
+    "Leaderboards": lambda: render_leaderboards_tab(selected_participant_sb, selected_week_str_sb),
+    "Overview": render_overview_tab,
+    "Individual Analysis": render_individual_analysis_tab,
+}
+if LAZY_TAB_NAVIGATION:
+    # Only the open tab runs; the others cost nothing until they are selected
+    active_tab = st.radio("Section", list(tab_renderers), horizontal=True, key="active_tab", label_visibility="collapsed")
+    tab_renderers[active_tab]()
+else:
+    for tab, render_tab in zip(st.tabs(list(tab_renderers)), tab_renderers.values()):
+        with tab:
+            render_tab()
+
+
 # --- Footer ---
 st.markdown("---")
 st.caption("🔥 Bourbon Chasers Strava Inferno | Data sourced from Strava activities | We Fight, We Suffer, We Survive 🔥")
@@ -0,0 +1,129 @@
+# --- START OF FILE charts.py ---
+"""
+Plotly figure builders for the Bourbon Chasers dashboard. Shared by app.py (rendered with st.plotly_chart)
+and publish_snapshot.py (exported as static Plotly JSON/HTML), so both always show the same charts.
+Each builder takes the already-summarized data from scoreboard.py and returns a figure.
+"""
+
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+TITLE_FONT = dict(family='UnifrakturCook, serif', color='#D4AF37')
+
+def build_rank_history_chart(rank_history, cumulative_points):
+    """Bump chart of overall rank by week (rank 1 at the top)."""
+    rank_history_long = rank_history.rename_axis(index="Participant", columns="Week").stack().rename("Rank").reset_index()
+    rank_history_long["Cumulative Points"] = cumulative_points.stack().to_numpy()
+    rank_history_long["Participant"] = rank_history_long["Participant"].astype(str)
+
+    fig_bump = px.line(
+        rank_history_long, x="Week", y="Rank", color="Participant", markers=True, template="plotly_dark",
+        hover_data={"Cumulative Points": ":.0f"}, labels={"Week": "Competition Week"}
+    )
+    fig_bump.update_layout(
+        title=dict(text="Overall Rank by Week", x=0.01, xanchor='left', font=TITLE_FONT),
+        yaxis=dict(autorange="reversed", dtick=1, title="Rank"), xaxis=dict(dtick=1), legend_title_text="Participant"
+    )
+    return fig_bump
+
+def build_runners_chart(melted_data):
+    """Grouped horizontal bars of total running distance and duration per participant, with pace labels."""
+    # Create the bar chart - SIMPLIFIED HOVER
+    fig_runners = px.bar(
+        melted_data, x="Display Value", y="Participant", color="Metric Label", orientation="h",
+        color_discrete_map={"Distance (miles)": "#E25822", "Duration (hours)": "#FFD700"}, template="plotly_dark",
+        hover_name="Participant"  # Just use hover_name, no hover_data
+    )
+
+    # Add custom hover templates based on metric type
+    for i, d in enumerate(fig_runners.data):
+        if "Distance" in d.name:
+            # Format for distance bars
+            fig_runners.data[i].hovertemplate = '%{y}<br>Distance: %{x:.2f} miles<br>Pace: %{customdata[0]}<extra></extra>'
+        else:
+            # Format for duration bars
+            fig_runners.data[i].hovertemplate = '%{y}<br>Duration: %{x:.2f} hours<extra></extra>'
+
+    # Add custom data for hover
+    fig_runners.update_traces(
+        customdata=melted_data[['Pace_Text']],
+        selector=dict(type='bar')
+    )
+
+    # Add text labels
+    text_labels = melted_data.apply(
+        lambda row: row['Pace_Text'] if row['Metric Label'] == 'Distance (miles)' else f"{row['Display Value']:.1f} hrs",
+        axis=1
+    )
+    fig_runners.update_traces(text=text_labels, textposition='auto', selector=dict(type='bar'))
+
+    # Update layout
+    fig_runners.update_layout(
+        title=dict(text="Total Running Distance & Duration by Bourbon Chaser", x=0.01, xanchor="left", font=dict(size=20, **TITLE_FONT)),
+        xaxis_title="Value (Miles or Hours)", yaxis_title="Participant", legend_title_text="Metric", barmode='group', yaxis={'categoryorder':'total ascending'}
+    )
+    return fig_runners
+
+def build_weekly_miles_chart(weekly_distance):
+    """Line chart of total group miles run per week."""
+    fig_weekly_miles = px.line( weekly_distance, x="Week", y="Total Distance", markers=True, labels={"Total Distance": "Total Distance (Miles)", "Week": "Competition Week"}, template="plotly_dark")
+    fig_weekly_miles.update_layout( title=dict(text="Total Group Miles Run by Week", x=0.01, xanchor='left', font=TITLE_FONT), yaxis_title="Total Distance (Miles)")
+    fig_weekly_miles.update_traces(line=dict(color='#E25822'))
+    return fig_weekly_miles
+
+def build_zone_comparison_chart(zone_comparison_df, participant):
+    """Grouped bars of a participant's minutes per HR zone next to the group average."""
+    fig_zone_comparison = px.bar( zone_comparison_df.melt(id_vars=["Zone"], var_name="Type", value_name="Minutes"), x="Zone", y="Minutes", color="Type", barmode="group", template="plotly_dark", color_discrete_map={f"{participant}": "#FFD700", "Group Average": "#AAAAAA"})
+    fig_zone_comparison.update_layout( title=dict(text=f"{participant}'s Time per Zone vs. Group Average", x=0.01, xanchor='left', font=TITLE_FONT), yaxis_title="Total Minutes", xaxis_title="Heart Rate Zone", legend_title_text="")
+    return fig_zone_comparison
+
+def build_cumulative_points_chart(ind_cum_points, participant):
+    """Line chart of a participant's cumulative points by week."""
+    fig_ind_cum_points = px.line( ind_cum_points, x="Week", y="Points", markers=True, template="plotly_dark", labels={"Points": "Cumulative Points", "Week": "Competition Week"})
+    fig_ind_cum_points.update_layout( title=dict(text=f"{participant}'s Cumulative Points", x=0.01, xanchor='left', font=TITLE_FONT), yaxis_title="Cumulative Points")
+    fig_ind_cum_points.update_traces(line=dict(color='#FFD700'))
+    return fig_ind_cum_points
+
+def build_activity_pie(activity_breakdown, values_col, title_text):
+    """Donut chart of a participant's activities by Workout Type (by count or by duration)."""
+    fig_act = px.pie(activity_breakdown, names='Workout Type', values=values_col, template="plotly_dark", hole=0.3)
+    fig_act.update_traces(textposition='inside', textinfo='percent+label', marker=dict(line=dict(color='#000000', width=1)))
+    fig_act.update_layout(showlegend=False, title_text=title_text, title_x=0.5, title_font_family='UnifrakturCook, serif', title_font_color='#D4AF37')
+    return fig_act
+
+def build_training_load_chart(load_series, participant, metric_label):
+    """Daily load bars with acute/chronic load lines, and the acute:chronic ratio on a secondary axis."""
+    fig_load = make_subplots(specs=[[{"secondary_y": True}]])
+    fig_load.add_trace(go.Bar(x=load_series["Date"], y=load_series["Daily Load"], name="Daily Load", marker_color="#555555"), secondary_y=False)
+    fig_load.add_trace(go.Scatter(x=load_series["Date"], y=load_series["Acute Load"], name="Acute (7-day)", line=dict(color="#E25822")), secondary_y=False)
+    fig_load.add_trace(go.Scatter(x=load_series["Date"], y=load_series["Chronic Load"], name="Chronic (28-day)", line=dict(color="#FFD700")), secondary_y=False)
+    fig_load.add_trace(go.Scatter(x=load_series["Date"], y=load_series["ACWR"], name="Acute:Chronic Ratio", line=dict(color="#00BFFF", dash="dot")), secondary_y=True)
+    fig_load.add_hrect(y0=0.8, y1=1.3, fillcolor="#00FF00", opacity=0.08, line_width=0, secondary_y=True) # Commonly cited "sweet spot"
+    fig_load.update_layout(
+        template="plotly_dark", title=dict(text=f"{participant}'s Training Load ({metric_label})", x=0.01, xanchor='left', font=TITLE_FONT),
+        legend=dict(orientation="h", y=-0.2), bargap=0.1
+    )
+    fig_load.update_yaxes(title_text=f"Average Daily {metric_label}", secondary_y=False)
+    fig_load.update_yaxes(title_text="Acute:Chronic Ratio", secondary_y=True, showgrid=False)
+    return fig_load
+
+def build_head_to_head_chart(weeks_won, point_margin):
+    """Heatmap of weeks won by each row participant against each column participant; hover adds the cumulative margin."""
+    weeks_lost = weeks_won.T.to_numpy()
+    fig_h2h = px.imshow(
+        weeks_won, color_continuous_scale=["#1E1E1E", "#E25822", "#FFD700"], aspect="auto",
+        text_auto=len(weeks_won) <= 30, template="plotly_dark", labels=dict(x="Opponent", y="Participant", color="Weeks Won")
+    )
+    fig_h2h.update_traces(
+        customdata=np.dstack([weeks_lost, point_margin.to_numpy()]),
+        hovertemplate="%{y} vs %{x}<br>Weeks won: %{z} | lost: %{customdata[0]}<br>Point margin: %{customdata[1]:+,.0f}<extra></extra>",
+    )
+    fig_h2h.update_layout(
+        title=dict(text="Head-to-Head: Weeks Won", x=0.01, xanchor='left', font=TITLE_FONT),
+        xaxis=dict(side="top", tickangle=-45), height=max(400, 28 * len(weeks_won) + 150)
+    )
+    return fig_h2h
+
+# --- END OF FILE charts.py ---
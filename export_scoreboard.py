@@ -0,0 +1,200 @@
+# --- START OF FILE export_scoreboard.py ---
+"""
+Exports the processed scoreboard back to a workbook, so organizers no longer rebuild
+TieDye_Weekly_Scoreboard.xlsx by hand. The xlsx has the activity log first (the sheet app.py reads back),
+then the leaderboard with Week N Totals, then one sheet per participant. CSV and Parquet get one file per table.
+
+Rows are streamed in fixed-size chunks: openpyxl's write-only mode serializes each row as it is appended
+instead of building a cell object per value, CSV is appended chunk by chunk, and Parquet is written one row
+group at a time. Writer memory stays flat however long the history is.
+
+Run with:  python export_scoreboard.py --output exports [--format xlsx csv parquet]
+Benchmark: python export_scoreboard.py --benchmark 100000
+"""
+
+import argparse
+import os
+import re
+import time
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+
+from scoreboard import DATA_URL, competition_total_weeks, load_scoreboard, calculate_leaderboard
+
+CHUNK_ROWS = 5000
+EXPORT_FORMATS = ["xlsx", "csv", "parquet"]
+
+
+# --- Table Preparation ---
+def build_export_tables(weekly_data, total_weeks=competition_total_weeks):
+    """Returns {table name: DataFrame}: the activity log (oldest first) and the leaderboard."""
+    activity_log = weekly_data.sort_values("Date", kind="stable") if "Date" in weekly_data.columns else weekly_data
+    tables = {
+        "Activity Log": activity_log.reset_index(drop=True),
+        "Leaderboard": calculate_leaderboard(weekly_data.copy(), total_weeks),
+    }
+    return tables
+
+def iter_row_chunks(df, chunk_rows=CHUNK_ROWS):
+    """Yields lists of plain-Python row tuples (NaN -> None, categoricals -> str), chunk_rows at a time."""
+    for start in range(0, len(df), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows].astype(object)
+        yield list(chunk.where(chunk.notna(), None).itertuples(index=False, name=None))
+
+def sheet_title(name, used_titles):
+    """Excel-safe, unique sheet title (max 31 chars, no []:*?/\\)."""
+    base = re.sub(r"[\[\]:*?/\\]", "_", str(name)).strip("'")[:31] or "Sheet"
+    title, n = base, 2
+    while title.lower() in used_titles:
+        suffix = f" ({n})"
+        title, n = base[:31 - len(suffix)] + suffix, n + 1
+    used_titles.add(title.lower())
+    return title
+
+
+# --- Writers ---
+def write_xlsx(tables, target, chunk_rows=CHUNK_ROWS):
+    """
+    Streams the tables plus one sheet per participant into a write-only workbook.
+    target is a path or a binary file object (e.g. BytesIO for a download button).
+    """
+    workbook = Workbook(write_only=True)
+    used_titles = set()
+
+    def write_sheet(title, df):
+        sheet = workbook.create_sheet(sheet_title(title, used_titles))
+        sheet.append([str(c) for c in df.columns])
+        for rows in iter_row_chunks(df, chunk_rows):
+            for row in rows:
+                sheet.append(row)
+
+    for name, df in tables.items():
+        write_sheet(name, df)
+    activity_log = tables["Activity Log"]
+    if "Participant" in activity_log.columns:
+        participant_rows = activity_log.groupby(activity_log["Participant"].astype(str), sort=True).indices
+        for participant, positions in participant_rows.items():
+            write_sheet(participant, activity_log.iloc[positions])
+    workbook.save(target)
+
+def write_csv(tables, output_dir, chunk_rows=CHUNK_ROWS):
+    paths = []
+    for name, df in tables.items():
+        path = os.path.join(output_dir, f"{table_slug(name)}.csv")
+        for start in range(0, max(len(df), 1), chunk_rows):
+            df.iloc[start:start + chunk_rows].to_csv(path, mode="w" if start == 0 else "a", header=start == 0, index=False)
+        paths.append(path)
+    return paths
+
+def write_parquet(tables, output_dir, chunk_rows=CHUNK_ROWS):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow).")
+    paths = []
+    for name, df in tables.items():
+        path = os.path.join(output_dir, f"{table_slug(name)}.parquet")
+        schema = pa.Schema.from_pandas(df.iloc[:0], preserve_index=False)
+        with pq.ParquetWriter(path, schema) as writer:
+            for start in range(0, len(df), chunk_rows):
+                writer.write_table(pa.Table.from_pandas(df.iloc[start:start + chunk_rows], schema=schema, preserve_index=False))
+        paths.append(path)
+    return paths
+
+def table_slug(name):
+    return re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")
+
+def export_scoreboard(weekly_data, output_dir, formats=("xlsx",), basename="TieDye_Weekly_Scoreboard"):
+    """Writes the requested formats into output_dir. Returns the list of files written."""
+    os.makedirs(output_dir, exist_ok=True)
+    tables = build_export_tables(weekly_data)
+    written = []
+    if "xlsx" in formats:
+        path = os.path.join(output_dir, f"{basename}.xlsx")
+        write_xlsx(tables, path)
+        written.append(path)
+    if "csv" in formats:
+        written += write_csv(tables, output_dir)
+    if "parquet" in formats:
+        written += write_parquet(tables, output_dir)
+    return written
+
+def export_workbook_bytes(weekly_data):
+    """The xlsx export as bytes, for st.download_button."""
+    buffer = BytesIO()
+    write_xlsx(build_export_tables(weekly_data), buffer)
+    return buffer.getvalue()
+
+
+# --- Benchmark ---
+def make_benchmark_history(weekly_data, n_rows, seed=0):
+    """Synthetic multi-season history: real activities resampled with replacement, shifted by whole seasons."""
+    rng = np.random.default_rng(seed)
+    sample = weekly_data.iloc[rng.integers(0, len(weekly_data), n_rows)].reset_index(drop=True)
+    season = np.arange(n_rows) * 10 // max(n_rows, 1) # Ten seasons
+    sample["Date"] = pd.to_datetime(sample["Date"]) - pd.to_timedelta(season * 364, unit="D")
+    return sample
+
+def write_xlsx_pandas(tables, target):
+    """The non-streaming baseline: pandas.to_excel, which builds every cell in openpyxl's object model first."""
+    with pd.ExcelWriter(target, engine="openpyxl") as writer:
+        for name, df in tables.items():
+            df.to_excel(writer, sheet_name=name, index=False)
+        for participant, df in tables["Activity Log"].groupby(tables["Activity Log"]["Participant"].astype(str)):
+            df.to_excel(writer, sheet_name=participant[:31], index=False)
+
+BENCHMARK_WRITERS = {
+    "xlsx, streaming write-only": lambda tables, out: write_xlsx(tables, os.path.join(out, "bench_streaming.xlsx")),
+    "xlsx, pandas/openpyxl object model": lambda tables, out: write_xlsx_pandas(tables, os.path.join(out, "bench_pandas.xlsx")),
+    "csv, chunked": lambda tables, out: write_csv(tables, out),
+    "parquet, row groups": lambda tables, out: write_parquet(tables, out),
+}
+
+def benchmark_writer(label, weekly_data, n_rows, output_dir):
+    """Runs one writer in this (fresh) process. Returns (seconds, peak RSS growth in MB over the prepared tables)."""
+    import resource # Unix-only, so imported here rather than when app.py imports this module
+    tables = build_export_tables(make_benchmark_history(weekly_data, n_rows))
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    BENCHMARK_WRITERS[label](tables, output_dir)
+    elapsed = time.perf_counter() - start
+    return elapsed, (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline) / 1024 # ru_maxrss is KB on Linux
+
+def run_benchmark(weekly_data, n_rows, output_dir):
+    import multiprocessing
+
+    os.makedirs(output_dir, exist_ok=True)
+    print(f"Benchmark: {n_rows:,} activities over ten seasons (each writer in a fresh process; memory = peak RSS growth while writing)")
+    ctx = multiprocessing.get_context("spawn")
+    for label in BENCHMARK_WRITERS:
+        with ctx.Pool(1) as pool:
+            elapsed, rss_growth_mb = pool.apply(benchmark_writer, (label, weekly_data, n_rows, output_dir))
+        print(f"  {label:<36} {elapsed:>7.2f}s   +{rss_growth_mb:>7.1f} MB")
+
+
+# --- Main ---
+def main():
+    parser = argparse.ArgumentParser(description="Export the processed scoreboard to xlsx/CSV/Parquet.")
+    parser.add_argument("--output", default="exports", help="Output directory (default: exports)")
+    parser.add_argument("--url", default=DATA_URL, help="Scoreboard workbook URL (default: SCOREBOARD_DATA_URL or GitHub)")
+    parser.add_argument("--format", nargs="+", choices=EXPORT_FORMATS, default=["xlsx"], help="Formats to write (default: xlsx)")
+    parser.add_argument("--benchmark", type=int, metavar="ROWS", help="Instead of exporting, benchmark the writers on ROWS synthetic activities")
+    args = parser.parse_args()
+
+    weekly_data, _, _, data_version = load_scoreboard(args.url)
+    if args.benchmark:
+        run_benchmark(weekly_data, args.benchmark, args.output)
+        return
+    written = export_scoreboard(weekly_data, args.output, args.format)
+    print(f"Exported data version {data_version}:")
+    for path in written:
+        print(f"  {path}")
+
+if __name__ == "__main__":
+    main()
+
+# --- END OF FILE export_scoreboard.py ---
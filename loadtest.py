@@ -0,0 +1,281 @@
+# --- START OF FILE loadtest.py ---
+"""
+Concurrent-session load test for the dashboard. Starts one real `streamlit run app.py` server against a local stub
+server that serves the workbook, background image and font CSS (so results don't depend on GitHub or Google Fonts),
+then connects N simulated viewers to it over Streamlit's websocket, speaking the same protobuf messages as a browser.
+
+Each session loads the app, then repeatedly changes the sidebar participant/week selectors or the Individual
+Analysis participant, timing every rerun. Sidebar changes rerun the whole script; the Individual Analysis
+selector sits inside a fragment, so it is sent as a fragment rerun exactly like the browser does. All sessions
+share the one server's caches and script threads, so the numbers show reruns queuing up as N grows.
+For every session count it reports rerun latency percentiles (full and fragment reruns separately), throughput
+of successful interactions and the server process's RSS (read from /proc, so Linux only).
+
+Run with:  python loadtest.py --sessions 1,4,8,16 --interactions 20
+"""
+
+import argparse
+import asyncio
+import functools
+import http.server
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+import numpy as np
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+ACTIONS = ["sidebar_participant", "sidebar_week", "individual_participant"]
+RSS_SAMPLE_SECONDS = 0.25
+
+
+# --- Stub Data Server ---
+def start_stub_server(directory):
+    """Serves directory over HTTP on a free local port from a daemon thread. Returns the base URL."""
+    handler = functools.partial(QuietHandler, directory=directory)
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+    """Static files, plus an empty /fonts.css so sessions never reach out to Google Fonts."""
+
+    def do_GET(self):
+        if self.path == "/fonts.css":
+            self.send_response(200)
+            self.send_header("Content-Type", "text/css")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+
+# --- Streamlit Server ---
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_streamlit_server(app_path, timeout=60):
+    """Starts `streamlit run app_path` headless on a free port and waits for its health check. Returns (process, port)."""
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", app_path, "--server.headless", "true", "--server.port", str(port),
+         "--server.fileWatcherType", "none", "--browser.gatherUsageStats", "false"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"streamlit exited with code {process.returncode} before it was ready")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=2) as response:
+                if response.status == 200:
+                    return process, port
+        except OSError:
+            time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError(f"streamlit did not become healthy within {timeout}s")
+
+def process_rss_mb(pid):
+    """Current resident set size of a process in MB (Linux /proc)."""
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+# --- Sessions ---
+def pick_other(options, current, rng):
+    """A random option different from the current one (reruns only happen when the value changes)."""
+    choices = [o for o in options if o != current] or list(options)
+    return rng.choice(choices)
+
+class ViewerSession:
+    """
+    One simulated browser tab: a websocket to the server plus the widget states the browser would send back.
+    Widgets are tracked by key from the element deltas of each run, together with the fragment they belong to.
+    """
+
+    def __init__(self, url, seed, timeout):
+        self.url = url
+        self.seed = seed
+        self.timeout = timeout
+        self.widgets = {} # key -> (Selectbox/Radio proto, fragment id or "")
+        self.widget_values = {} # widget id -> selected option label
+        self.results = [] # (action, seconds, ok, fragment rerun)
+
+    async def connect(self):
+        self.websocket = await websockets.connect(self.url, subprotocols=["streamlit"], max_size=None)
+
+    def value(self, key):
+        proto, _ = self.widgets[key]
+        return self.widget_values.get(proto.id, proto.options[proto.default] if proto.options else None)
+
+    async def select(self, key, option, action):
+        proto, fragment_id = self.widgets[key]
+        self.widget_values[proto.id] = option
+        await self.rerun(action, fragment_id)
+
+    async def rerun(self, action, fragment_id=""):
+        msg = BackMsg()
+        client_state = msg.rerun_script
+        client_state.widget_states.SetInParent()
+        for widget_id, option in self.widget_values.items():
+            widget_state = client_state.widget_states.widgets.add()
+            widget_state.id = widget_id
+            widget_state.string_value = option
+        if fragment_id:
+            client_state.fragment_id = fragment_id
+
+        start = time.perf_counter()
+        ok = True
+        try:
+            await self.websocket.send(msg.SerializeToString())
+            while True:
+                forward_msg = ForwardMsg()
+                forward_msg.ParseFromString(await asyncio.wait_for(self.websocket.recv(), self.timeout))
+                kind = forward_msg.WhichOneof("type")
+                if kind == "delta" and forward_msg.delta.WhichOneof("type") == "new_element":
+                    element = forward_msg.delta.new_element
+                    element_type = element.WhichOneof("type")
+                    if element_type == "exception":
+                        ok = False
+                    elif element_type in ("selectbox", "radio"):
+                        proto = getattr(element, element_type)
+                        self.widgets[proto.id.rsplit("-", 1)[-1]] = (proto, forward_msg.delta.fragment_id)
+                elif kind == "script_finished":
+                    ok = ok and forward_msg.script_finished != ForwardMsg.FINISHED_WITH_COMPILE_ERROR
+                    break
+        except (asyncio.TimeoutError, websockets.ConnectionClosed) as e:
+            print(f"Session {self.seed} {action} failed: {e!r}")
+            ok = False
+        self.results.append((action, time.perf_counter() - start, ok, bool(fragment_id)))
+
+async def run_session(url, interactions, seed, timeout):
+    """One simulated viewer. Returns (results, interaction phase (start, end) as wall-clock times)."""
+    rng = random.Random(seed)
+    session = ViewerSession(url, seed, timeout)
+    await session.connect()
+    try:
+        await session.rerun("initial_load")
+        phase_start = time.time()
+        for _ in range(interactions):
+            action = rng.choice(ACTIONS)
+            try:
+                if action == "individual_participant":
+                    if session.value("active_tab") != "Individual Analysis":
+                        await session.select("active_tab", "Individual Analysis", "tab_switch")
+                    key = "ind_participant_select"
+                else:
+                    key = "sb_participant" if action == "sidebar_participant" else "sb_week"
+                proto, _ = session.widgets[key]
+                option = pick_other(proto.options, session.value(key), rng)
+            except (KeyError, IndexError) as e: # Widget missing, e.g. the data failed to load
+                print(f"Session {seed} could not find the widget for {action}: {e}")
+                session.results.append((action, 0.0, False, False))
+                continue
+            await session.select(key, option, action)
+        return session.results, (phase_start, time.time())
+    finally:
+        await session.websocket.close()
+
+async def run_level(url, n_sessions, interactions, timeout, server_pid):
+    """Runs n_sessions viewers at once against the server, sampling its RSS. Returns (results, phases, peak RSS MB)."""
+    rss_samples = [process_rss_mb(server_pid)]
+    done = asyncio.Event()
+
+    async def sample_rss():
+        while not done.is_set():
+            rss_samples.append(process_rss_mb(server_pid))
+            await asyncio.sleep(RSS_SAMPLE_SECONDS)
+
+    sampler = asyncio.create_task(sample_rss())
+    session_results = await asyncio.gather(*[run_session(url, interactions, seed, timeout) for seed in range(n_sessions)])
+    done.set()
+    await sampler
+    results = [r for session_result, _ in session_results for r in session_result]
+    return results, [phase for _, phase in session_results], max(rss_samples)
+
+
+# --- Reporting ---
+def summarize_level(n_sessions, results, phases, rss_before_mb, rss_peak_mb):
+    """Latency percentiles over successful interaction reruns; throughput is those reruns per second of interaction phase."""
+    interaction = [(seconds, fragment) for action, seconds, ok, fragment in results if ok and action != "initial_load"]
+    latencies = np.array([seconds for seconds, _ in interaction])
+    full = np.array([seconds for seconds, fragment in interaction if not fragment])
+    fragment = np.array([seconds for seconds, fragment in interaction if fragment])
+    initial = np.array([seconds for action, seconds, ok, _ in results if ok and action == "initial_load"])
+    p90, p99 = np.percentile(latencies, [90, 99]) if latencies.size else (np.nan,) * 2
+    interaction_seconds = max(end for _, end in phases) - min(start for start, _ in phases)
+    return {
+        "sessions": n_sessions, "reruns": len(results),
+        "errors": sum(not ok for _, _, ok, _ in results),
+        "initial_p50": np.median(initial) if initial.size else np.nan,
+        "full_p50": np.median(full) if full.size else np.nan, "fragment_p50": np.median(fragment) if fragment.size else np.nan,
+        "p90": p90, "p99": p99, "max": latencies.max() if latencies.size else np.nan,
+        "throughput": latencies.size / interaction_seconds if interaction_seconds > 0 else np.nan,
+        "rss_before_mb": rss_before_mb, "rss_peak_mb": rss_peak_mb,
+    }
+
+def print_report(rows):
+    header = (f"{'sessions':>8} {'reruns':>6} {'errors':>6} {'load p50':>9} {'full p50':>9} {'frag p50':>9} {'p90':>7} {'p99':>7} "
+              f"{'max':>7} {'reruns/s':>9} {'RSS before':>11} {'RSS peak':>9}")
+    print("\n" + header + "\n" + "-" * len(header))
+    for r in rows:
+        print(f"{r['sessions']:>8} {r['reruns']:>6} {r['errors']:>6} {r['initial_p50']:>8.2f}s {r['full_p50']:>8.2f}s {r['fragment_p50']:>8.2f}s "
+              f"{r['p90']:>6.2f}s {r['p99']:>6.2f}s {r['max']:>6.2f}s {r['throughput']:>9.2f} "
+              f"{r['rss_before_mb']:>9.0f}MB {r['rss_peak_mb']:>7.0f}MB")
+
+
+# --- Main ---
+def main():
+    parser = argparse.ArgumentParser(description="Load-test app.py with many concurrent sessions on one Streamlit server.")
+    parser.add_argument("--sessions", default="1,4,8", help="Comma-separated concurrent session counts to test (default: 1,4,8)")
+    parser.add_argument("--interactions", type=int, default=10, help="Widget changes per session after the initial load (default: 10)")
+    parser.add_argument("--app", default=os.path.join(REPO_DIR, "app.py"), help="Streamlit script to test")
+    parser.add_argument("--data-dir", default=REPO_DIR, help="Directory served by the stub server (needs the workbook and bg_smolder.png)")
+    parser.add_argument("--timeout", type=float, default=120, help="Per-rerun timeout in seconds")
+    args = parser.parse_args()
+
+    base_url = start_stub_server(args.data_dir)
+    # The Streamlit server inherits these, so app.py/scoreboard.py read from the stub server instead of GitHub
+    os.environ["SCOREBOARD_DATA_URL"] = f"{base_url}/TieDye_Weekly_Scoreboard.xlsx"
+    os.environ["SCOREBOARD_IMAGE_URL"] = f"{base_url}/bg_smolder.png"
+    os.environ["SCOREBOARD_FONTS_URL"] = f"{base_url}/fonts.css"
+    print(f"Stub data server at {base_url}")
+
+    server, port = start_streamlit_server(args.app)
+    url = f"ws://127.0.0.1:{port}/_stcore/stream"
+    print(f"Streamlit server (pid {server.pid}) at http://127.0.0.1:{port}")
+    rows = []
+    try:
+        # One server for every level, like a real deployment: the first level also pays for the cold caches
+        for n_sessions in [int(s) for s in args.sessions.split(",")]:
+            print(f"Running {n_sessions} concurrent sessions...")
+            rss_before_mb = process_rss_mb(server.pid)
+            results, phases, rss_peak_mb = asyncio.run(run_level(url, n_sessions, args.interactions, args.timeout, server.pid))
+            rows.append(summarize_level(n_sessions, results, phases, rss_before_mb, rss_peak_mb))
+            print_report(rows[-1:])
+    finally:
+        server.terminate()
+        server.wait()
+
+    print_report(rows)
+
+if __name__ == "__main__":
+    main()
+
+# --- END OF FILE loadtest.py ---
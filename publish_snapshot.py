@@ -0,0 +1,284 @@
+# --- START OF FILE publish_snapshot.py ---
+"""
+Static snapshot publisher for the Bourbon Chasers scoreboard. Prerenders the leaderboard, the group charts
+and one page per participant into plain HTML/JSON that any static file server can host, so viewers who only
+check the standings never need a Streamlit rerun. The live app stays around for interactive exploration.
+
+A snapshot is published only when the scoreboard's data version changes, and only the newest --keep
+snapshots are kept on disk:
+
+    site/
+      index.html            -> redirects to the latest snapshot
+      latest.json           -> {"data_version": ..., "published_at": ..., "path": ...}
+      <data_version>/
+        index.html          leaderboard + group charts
+        leaderboard.json, participants.json
+        charts/*.json|html  Plotly figure JSON and standalone chart pages
+        participants/<slug>.html
+
+Run with:  python publish_snapshot.py --output site [--force] [--watch 300] [--keep 5]
+"""
+
+import argparse
+import html
+import json
+import os
+import re
+import shutil
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from scoreboard import (
+    DATA_URL, competition_total_weeks, week_dates, get_competition_week, load_scoreboard,
+    calculate_leaderboard, build_weekly_points_matrix, calculate_rank_history, calculate_head_to_head, summarize_running_totals,
+    summarize_participant_totals, summarize_participants, summarize_weekly_running_distance,
+    summarize_zone_comparison, summarize_cumulative_points, summarize_activity_breakdown,
+)
+from charts import (
+    build_rank_history_chart, build_runners_chart, build_weekly_miles_chart,
+    build_zone_comparison_chart, build_cumulative_points_chart, build_activity_pie, build_head_to_head_chart,
+)
+
+PLOTLY_CDN = "https://cdn.plot.ly/plotly-2.35.2.min.js"
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{title}</title>
+<link href="https://fonts.googleapis.com/css2?family=UnifrakturCook:wght@700&display=swap" rel="stylesheet">
+<script src="{plotly_cdn}"></script>
+<style>
+  body {{ background-color: #1E1E1E; color: #E0E0E0; font-family: sans-serif; margin: 2rem auto; max-width: 1100px; padding: 0 1rem; }}
+  h1, h2 {{ font-family: 'UnifrakturCook', serif; color: #D4AF37; }}
+  a {{ color: #FFD700; }}
+  table {{ border-collapse: collapse; width: 100%; margin-bottom: 2rem; }}
+  th, td {{ border: 1px solid #444; padding: 0.4rem 0.6rem; text-align: right; }}
+  th {{ background-color: #333; color: #D4AF37; }}
+  td:first-child, th:first-child {{ text-align: left; }}
+  .meta {{ color: #A0A0A0; font-size: 0.9rem; }}
+</style>
+</head>
+<body>
+{body}
+<p class="meta">Snapshot of data version {data_version}, published {published_at}. For interactive filters use the live dashboard.</p>
+</body>
+</html>
+"""
+
+REDIRECT_TEMPLATE = """<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"><meta http-equiv="refresh" content="0; url={path}/index.html">
+<title>Bourbon Chasers Scoreboard</title></head>
+<body><a href="{path}/index.html">Latest scoreboard</a></body></html>
+"""
+
+
+# --- File Helpers ---
+def slugify(name):
+    """File-safe slug for a participant name."""
+    return re.sub(r"[^a-z0-9]+", "-", str(name).lower()).strip("-") or "participant"
+
+def participant_slugs(names):
+    """{name: unique slug}; names that slugify the same (e.g. "Jo Smith" and "jo-smith") get -2, -3... suffixes."""
+    slugs, used = {}, set()
+    for name in names:
+        base = slugify(name)
+        slug, n = base, 2
+        while slug in used:
+            slug, n = f"{base}-{n}", n + 1
+        used.add(slug)
+        slugs[name] = slug
+    return slugs
+
+def write_text(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+def write_text_atomic(path, text):
+    """Writes via a temp file + rename so readers never see a half-written file."""
+    tmp_path = f"{path}.tmp"
+    write_text(tmp_path, text)
+    os.replace(tmp_path, path)
+
+def read_published_version(output_dir):
+    try:
+        with open(os.path.join(output_dir, "latest.json"), encoding="utf-8") as f:
+            return json.load(f).get("data_version")
+    except (OSError, ValueError):
+        return None
+
+
+# --- Page Rendering ---
+class SnapshotWriter:
+    """Renders one snapshot's pages and chart files into a directory."""
+
+    def __init__(self, snapshot_dir, data_version, published_at):
+        self.snapshot_dir = snapshot_dir
+        self.data_version = data_version
+        self.published_at = published_at
+
+    def page(self, relative_path, title, body):
+        write_text(os.path.join(self.snapshot_dir, relative_path), PAGE_TEMPLATE.format(
+            title=html.escape(title), plotly_cdn=PLOTLY_CDN, body=body,
+            data_version=self.data_version, published_at=self.published_at,
+        ))
+
+    def chart(self, name, fig):
+        """Writes charts/<name>.json and a standalone charts/<name>.html; returns the embeddable div."""
+        write_text(os.path.join(self.snapshot_dir, "charts", f"{name}.json"), fig.to_json())
+        fig.write_html(os.path.join(self.snapshot_dir, "charts", f"{name}.html"), include_plotlyjs="cdn", full_html=True)
+        return fig.to_html(include_plotlyjs=False, full_html=False, default_width="100%")
+
+    def json(self, relative_path, df):
+        write_text(os.path.join(self.snapshot_dir, relative_path), df.to_json(orient="records", date_format="iso", indent=1))
+
+def render_section(title, content):
+    return f"<h2>{html.escape(title)}</h2>\n{content}\n"
+
+def render_table(df, links=None):
+    """HTML table with every text cell escaped; links maps Participant name -> href for the only raw HTML written."""
+    links = links or {}
+    df = df.copy()
+    for col in df.columns:
+        if not pd.api.types.is_numeric_dtype(df[col]):
+            if col == "Participant":
+                df[col] = df[col].astype(str).map(lambda p: f'<a href="{html.escape(links[p])}">{html.escape(p)}</a>' if p in links else html.escape(p))
+            else:
+                df[col] = df[col].map(lambda v: v if pd.isna(v) else html.escape(str(v)))
+    df.columns = [html.escape(str(c)) for c in df.columns]
+    return df.to_html(index=False, escape=False, float_format=lambda x: f"{x:,.1f}", border=0)
+
+def render_snapshot(snapshot_dir, weekly_data, data_version, today=None):
+    """Prerenders the leaderboard page, group charts and per-participant pages for one data version."""
+    today = today or datetime.today().date()
+    writer = SnapshotWriter(snapshot_dir, data_version, datetime.now().strftime("%Y-%m-%d %H:%M"))
+
+    leaderboard = calculate_leaderboard(weekly_data.copy(), competition_total_weeks)
+    participants = summarize_participants(weekly_data, leaderboard)
+    writer.json("leaderboard.json", leaderboard)
+    writer.json("participants.json", participants)
+
+    participant_names = leaderboard["Participant"].astype(str).tolist() if not leaderboard.empty else []
+    slugs = participant_slugs(participant_names)
+    links = {name: f"participants/{slugs[name]}.html" for name in participant_names}
+
+    # --- Leaderboard Page ---
+    sections = ["<h1>Bourbon Chasers Leaderboard</h1>", render_section("🏆 Leaderboard", render_table(leaderboard, links))]
+
+    weeks_to_show = min(get_competition_week(today), competition_total_weeks) if today >= week_dates[0][0] else 0
+    points_matrix = build_weekly_points_matrix(weekly_data, competition_total_weeks).iloc[:, :weeks_to_show]
+    if not points_matrix.empty:
+        rank_history, cumulative_points = calculate_rank_history(points_matrix)
+        sections.append(render_section("📈 Rank History", writer.chart("rank_history", build_rank_history_chart(rank_history, cumulative_points))))
+        weeks_won, point_margin = calculate_head_to_head(points_matrix)
+        sections.append(render_section("⚔️ Head-to-Head", writer.chart("head_to_head", build_head_to_head_chart(weeks_won, point_margin))))
+
+    melted_data = summarize_running_totals(weekly_data)
+    if not melted_data.empty:
+        sections.append(render_section("Top Runners by Distance and Duration", writer.chart("top_runners", build_runners_chart(melted_data))))
+
+    weekly_distance = summarize_weekly_running_distance(weekly_data)
+    if not weekly_distance.empty:
+        sections.append(render_section("Group Weekly Running Distance Progress", writer.chart("weekly_miles", build_weekly_miles_chart(weekly_distance))))
+
+    writer.page("index.html", "Bourbon Chasers Leaderboard", "\n".join(sections))
+
+    # --- Participant Pages ---
+    participant_totals = summarize_participant_totals(weekly_data)
+    participant_rows = participants.set_index("Participant") if not participants.empty else None
+    for name in participant_names:
+        individual_data = weekly_data[weekly_data["Participant"].astype(str) == name]
+        slug = slugs[name]
+        sections = ['<p><a href="../index.html">&larr; Leaderboard</a></p>', f"<h1>{html.escape(name)}</h1>"]
+        if participant_rows is not None:
+            sections.append(render_table(participant_rows.loc[[name]].rename_axis("Participant").reset_index()))
+
+        zone_comparison_df = summarize_zone_comparison(individual_data, participant_totals, name)
+        sections.append(render_section("Time in Zone vs. Group Average", writer.chart(f"{slug}_zones", build_zone_comparison_chart(zone_comparison_df, name))))
+
+        ind_cum_points = summarize_cumulative_points(individual_data)
+        if not ind_cum_points.empty:
+            sections.append(render_section("Cumulative Points Over Time", writer.chart(f"{slug}_cumulative_points", build_cumulative_points_chart(ind_cum_points, name))))
+
+        activity_counts, activity_duration = summarize_activity_breakdown(individual_data)
+        if not activity_counts.empty:
+            sections.append(render_section("Activity Breakdown", writer.chart(f"{slug}_activity_count", build_activity_pie(activity_counts, 'Count', 'By Count'))))
+        if not activity_duration.empty:
+            sections.append(writer.chart(f"{slug}_activity_duration", build_activity_pie(activity_duration, 'Total Duration', 'By Duration (min)')))
+
+        writer.page(os.path.join("participants", f"{slug}.html"), f"{name} - Bourbon Chasers", "\n".join(sections))
+
+    return len(participant_names)
+
+
+# --- Publishing ---
+DEFAULT_KEEP_SNAPSHOTS = 5
+
+SNAPSHOT_DIR_PATTERN = re.compile(r"^[0-9a-f]{12}$") # compute_data_version's format; nothing else in --output is touched
+
+def prune_snapshots(output_dir, keep, current_version):
+    """Deletes all but the newest keep snapshot directories (by publish time); the current one is never deleted."""
+    snapshots = [
+        entry for entry in os.scandir(output_dir)
+        if entry.is_dir() and SNAPSHOT_DIR_PATTERN.match(entry.name) and os.path.exists(os.path.join(entry.path, "index.html"))
+    ]
+    snapshots.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    old = [entry for entry in snapshots if entry.name != current_version][max(keep - 1, 0):]
+    for entry in old:
+        shutil.rmtree(entry.path, ignore_errors=True)
+    if old:
+        print(f"Removed {len(old)} old snapshot(s): {', '.join(entry.name for entry in old)}")
+
+def publish(output_dir, url=DATA_URL, force=False, keep=DEFAULT_KEEP_SNAPSHOTS):
+    """
+    Loads the scoreboard and publishes a snapshot if its data version is new (or force is set).
+    The snapshot is rendered into a temp directory and renamed into place, then latest.json and the
+    top-level redirect are swapped atomically and snapshots beyond the newest keep are removed.
+    Returns the published data version, or None if unchanged.
+    """
+    weekly_data, _, _, data_version = load_scoreboard(url)
+    if not force and data_version == read_published_version(output_dir):
+        print(f"Data version {data_version} already published; nothing to do.")
+        return None
+
+    start = time.perf_counter()
+    snapshot_dir = os.path.join(output_dir, data_version)
+    staging_dir = os.path.join(output_dir, f".staging-{data_version}")
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    participant_count = render_snapshot(staging_dir, weekly_data, data_version)
+    shutil.rmtree(snapshot_dir, ignore_errors=True) # Only non-empty with --force
+    os.replace(staging_dir, snapshot_dir)
+
+    write_text_atomic(os.path.join(output_dir, "latest.json"), json.dumps({
+        "data_version": data_version, "published_at": datetime.now().isoformat(timespec="seconds"), "path": data_version,
+    }, indent=1))
+    write_text_atomic(os.path.join(output_dir, "index.html"), REDIRECT_TEMPLATE.format(path=data_version))
+    print(f"Published snapshot {data_version} ({participant_count} participant pages) to {snapshot_dir} in {time.perf_counter() - start:.1f}s")
+    prune_snapshots(output_dir, keep, data_version)
+    return data_version
+
+def main():
+    parser = argparse.ArgumentParser(description="Prerender the scoreboard into a static site, once per data version.")
+    parser.add_argument("--output", default="site", help="Directory to publish into (default: site)")
+    parser.add_argument("--url", default=DATA_URL, help="Scoreboard workbook URL (default: SCOREBOARD_DATA_URL or GitHub)")
+    parser.add_argument("--force", action="store_true", help="Republish even if the data version is unchanged")
+    parser.add_argument("--watch", type=int, metavar="SECONDS", help="Keep running and check for new data every SECONDS")
+    parser.add_argument("--keep", type=int, default=DEFAULT_KEEP_SNAPSHOTS, help=f"Snapshots to keep on disk, including the latest (default: {DEFAULT_KEEP_SNAPSHOTS})")
+    args = parser.parse_args()
+
+    publish(args.output, args.url, args.force, args.keep)
+    while args.watch:
+        time.sleep(args.watch)
+        try:
+            publish(args.output, args.url, keep=args.keep)
+        except Exception as e:
+            print(f"Snapshot publish failed: {e}")
+
+if __name__ == "__main__":
+    main()
+
+# --- END OF FILE publish_snapshot.py ---
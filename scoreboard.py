@@ -0,0 +1,941 @@
+# --- START OF FILE scoreboard.py ---
+"""
+Computation core for the Bourbon Chasers scoreboard: loading, preprocessing, scoring and standings.
+Shared by the Streamlit dashboard (app.py) and the standings API (api.py), so nothing in here touches Streamlit.
+"""
+
+import os
+import hashlib
+import threading
+import pandas as pd
+import numpy as np
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from io import BytesIO
+
+# --- Data Source ---
+# Override with the SCOREBOARD_DATA_URL environment variable (e.g. to point at a local copy of the workbook)
+DATA_URL = os.environ.get(
+    "SCOREBOARD_DATA_URL",
+    "https://github.com/Steven-Carter-Data/50k-Strava-Tracker/blob/main/TieDye_Weekly_Scoreboard.xlsx?raw=true"
+)
+
+# --- Competition Calendar ---
+competition_start_datetime = datetime(2025, 3, 10)
+competition_total_weeks = 8
+
+# Define date ranges for each week
+week_dates = [
+    (datetime(2025, 3, 10).date(), datetime(2025, 3, 17).date()),  # Week 1
+    (datetime(2025, 3, 18).date(), datetime(2025, 3, 24).date()),  # Week 2
+    (datetime(2025, 3, 25).date(), datetime(2025, 3, 31).date()),  # Week 3
+    (datetime(2025, 4, 1).date(), datetime(2025, 4, 7).date()),    # Week 4
+    (datetime(2025, 4, 8).date(), datetime(2025, 4, 14).date()),   # Week 5
+    (datetime(2025, 4, 15).date(), datetime(2025, 4, 21).date()),  # Week 6
+    (datetime(2025, 4, 22).date(), datetime(2025, 4, 28).date()),  # Week 7
+    (datetime(2025, 4, 29).date(), datetime(2025, 5, 5).date()),   # Week 8
+]
+
+def get_competition_week(day):
+    """Returns the competition week containing the given date (Week 1 before the start, the last week after the end)."""
+    # Find which week contains the date
+    for week_num, (start_date, end_date) in enumerate(week_dates, 1):
+        if start_date <= day <= end_date:
+            return week_num
+    # If the date is after the last week, use the last week
+    if day > week_dates[-1][1]:
+        return len(week_dates)
+    return 1  # Default to Week 1 if before competition start
+
+def get_competition_progress(day):
+    """
+    Returns (weeks_completed, weeks_remaining) as of the given date. weeks_remaining counts the
+    unfinished part of the current week as a fraction of a week.
+    """
+    if day > week_dates[-1][1]:
+        return competition_total_weeks, 0.0
+    if day < week_dates[0][0]:
+        return 0, float(competition_total_weeks)
+    current_week = get_competition_week(day)
+    current_week_start, current_week_end = week_dates[current_week - 1]
+    days_left_in_week = (current_week_end - day).days
+    days_in_week = (current_week_end - current_week_start).days + 1
+    return current_week - 1, (competition_total_weeks - current_week) + days_left_in_week / days_in_week
+
+# --- HTTP Fetch Layer ---
+# Every remote fetch shares one keep-alive connection pool. Transient failures (connection errors, 429/5xx)
+# are retried a bounded number of times with exponential backoff (0.5s, 1s, 2s).
+FETCH_RETRY = Retry(
+    total=3, connect=3, read=2, backoff_factor=0.5,
+    status_forcelist=(429, 500, 502, 503, 504), allowed_methods=frozenset(["GET", "HEAD"]),
+)
+_http_session = None
+_http_session_lock = threading.Lock()
+
+def get_http_session():
+    """Returns the process-wide pooled requests.Session, creating it on first use."""
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=8, pool_maxsize=16, max_retries=FETCH_RETRY)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _http_session = session
+    return _http_session
+
+def fetch_url(url, timeout=20):
+    """GETs a URL over the pooled session and returns the body bytes. Raises requests exceptions once retries run out."""
+    response = get_http_session().get(url, timeout=timeout)
+    response.raise_for_status()
+    return response.content
+
+def fetch_concurrently(fetches):
+    """
+    Fetches several URLs at once. fetches maps name -> (url, timeout); returns name -> (content, error),
+    with exactly one of the two set. Total wait is the slowest fetch rather than the sum of all of them.
+    """
+    with ThreadPoolExecutor(max_workers=max(len(fetches), 1)) as pool:
+        futures = {name: pool.submit(fetch_url, url, timeout) for name, (url, timeout) in fetches.items()}
+    results = {}
+    for name, future in futures.items():
+        try:
+            results[name] = (future.result(), None)
+        except Exception as e:
+            results[name] = (None, e)
+    return results
+
+# --- Data Loading Function ---
+def parse_weekly_data(content):
+    """Parses the weekly scoreboard Excel file from its raw bytes."""
+    df = pd.read_excel(BytesIO(content), engine="openpyxl")
+    print(f"Data loaded successfully. Shape: {df.shape}")
+    print(f"Initial columns: {df.columns.tolist()}")
+    return df
+
+def fetch_weekly_data(url):
+    """
+    Downloads and parses the weekly scoreboard Excel file from a URL.
+    Raises requests exceptions on network errors; callers decide how to surface them.
+    """
+    print(f"Attempting to load data from: {url}")
+    return parse_weekly_data(fetch_url(url, timeout=20))
+
+# --- Scoring Rules ---
+ZONE_COLUMNS = ["Zone 1", "Zone 2", "Zone 3", "Zone 4", "Zone 5"]
+
+# A rule set is plain data so organizers can try alternatives without touching the scoring code:
+#   zone_weights:        points per minute in each HR zone
+#   workout_multipliers: optional per-Workout Type factor applied to the zone points (missing types = 1.0)
+#   daily_cap:           optional max points per participant per day (activities scaled down proportionally)
+#   bonuses:             optional flat bonuses, e.g. {"zones": ["Zone 4", "Zone 5"], "min_minutes": 20, "points": 25}
+DEFAULT_SCORING_RULES = {
+    "zone_weights": {"Zone 1": 1, "Zone 2": 2, "Zone 3": 3, "Zone 4": 4, "Zone 5": 5},
+    "workout_multipliers": {},
+    "daily_cap": None,
+    "bonuses": [],
+}
+
+# Candidate rule sets shown side by side in the admin scoring comparison
+CANDIDATE_SCORING_RULES = {
+    "Standard": DEFAULT_SCORING_RULES,
+    "Flat Minutes": {"zone_weights": {"Zone 1": 1, "Zone 2": 1, "Zone 3": 1, "Zone 4": 1, "Zone 5": 1}},
+    "Zone 2 Builder": {"zone_weights": {"Zone 1": 1, "Zone 2": 3, "Zone 3": 2, "Zone 4": 3, "Zone 5": 4}},
+    "Cardio Focus": {**DEFAULT_SCORING_RULES, "workout_multipliers": {"Weight Training": 0.5, "Workout": 0.5}},
+    "Daily Cap 500": {**DEFAULT_SCORING_RULES, "daily_cap": 500},
+    "Threshold Bonus": {**DEFAULT_SCORING_RULES, "bonuses": [{"zones": ["Zone 4", "Zone 5"], "min_minutes": 20, "points": 25}]},
+}
+
+def compile_scoring_rules(rule_sets):
+    """
+    Compiles a dict of {name: rules} into arrays that score every activity under every rule set at once:
+    a (5 x k) zone weights matrix, a (workout type x k) multiplier table, a length-k daily cap vector
+    and a list of bonus rules tagged with the column they apply to.
+    """
+    names = list(rule_sets.keys())
+    weights = np.zeros((len(ZONE_COLUMNS), len(names)))
+    daily_caps = np.full(len(names), np.inf)
+    workout_types = sorted({wt for rules in rule_sets.values() for wt in (rules.get("workout_multipliers") or {})})
+    multipliers = np.ones((len(workout_types) + 1, len(names))) # Last row = types without a multiplier
+    bonuses = []
+
+    for j, name in enumerate(names):
+        rules = rule_sets[name]
+        zone_weights = rules.get("zone_weights", DEFAULT_SCORING_RULES["zone_weights"])
+        weights[:, j] = [zone_weights.get(z, 0) for z in ZONE_COLUMNS]
+        for wt, factor in (rules.get("workout_multipliers") or {}).items():
+            multipliers[workout_types.index(wt), j] = factor
+        if rules.get("daily_cap") is not None:
+            daily_caps[j] = rules["daily_cap"]
+        for bonus in rules.get("bonuses") or []:
+            zone_mask = np.array([1.0 if z in bonus["zones"] else 0.0 for z in ZONE_COLUMNS])
+            bonuses.append((j, zone_mask, bonus["min_minutes"], bonus["points"]))
+
+    return {"names": names, "weights": weights, "workout_types": workout_types,
+            "multipliers": multipliers, "daily_caps": daily_caps, "bonuses": bonuses}
+
+def score_activities(data, rule_sets):
+    """
+    Scores every activity under every rule set in one pass.
+    Returns a DataFrame aligned to data's index with one points column per rule set.
+    """
+    compiled = compile_scoring_rules(rule_sets)
+    zone_matrix = data.reindex(columns=ZONE_COLUMNS).apply(pd.to_numeric, errors='coerce').fillna(0).to_numpy(dtype=np.float64)
+
+    # Zone points for every (activity, rule set) pair: (n x 5) @ (5 x k)
+    points = zone_matrix @ compiled["weights"]
+
+    # Per-workout-type multipliers: gather one multiplier row per activity
+    if compiled["workout_types"] and "Workout Type" in data.columns:
+        type_codes = pd.Index(compiled["workout_types"]).get_indexer(data["Workout Type"].astype(str))
+        type_codes = np.where(type_codes < 0, len(compiled["workout_types"]), type_codes)
+        points *= compiled["multipliers"][type_codes]
+
+    # Flat bonuses for activities that reach the minutes threshold in the bonus zones
+    for j, zone_mask, min_minutes, bonus_points in compiled["bonuses"]:
+        points[:, j] += np.where(zone_matrix @ zone_mask >= min_minutes, bonus_points, 0)
+
+    # Daily caps: scale each participant-day down so it sums to at most the cap
+    capped = np.isfinite(compiled["daily_caps"])
+    if capped.any() and all(c in data.columns for c in ["Participant", "Date"]):
+        day_codes = data.groupby(["Participant", pd.to_datetime(data["Date"]).dt.normalize()], observed=True, sort=False).ngroup().to_numpy()
+        valid = day_codes >= 0
+        daily_totals = np.zeros((day_codes.max() + 1 if valid.any() else 0, points.shape[1]))
+        np.add.at(daily_totals, day_codes[valid], points[valid])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            scale = np.where(daily_totals > compiled["daily_caps"], compiled["daily_caps"] / daily_totals, 1.0)
+        points[valid] *= scale[day_codes[valid]]
+
+    return pd.DataFrame(points, index=data.index, columns=compiled["names"])
+
+def rescore_history(data, rule_sets):
+    """Rescores the full history under each rule set and returns per-participant totals and ranks side by side."""
+    if data is None or data.empty or "Participant" not in data.columns:
+        return pd.DataFrame()
+    scores = score_activities(data, rule_sets)
+    totals = scores.groupby(data["Participant"], observed=True).sum()
+    ranks = totals.rank(ascending=False, method="min").astype(int)
+    comparison = pd.concat([totals.round(0).astype(int), ranks.add_suffix(" Rank")], axis=1)
+    # Interleave points and rank per rule set, ordered by the first rule set's standings
+    ordered_cols = [c for name in totals.columns for c in (name, f"{name} Rank")]
+    comparison = comparison[ordered_cols].sort_values(by=totals.columns[0], ascending=False)
+    return comparison.reset_index().rename(columns={"index": "Participant"})
+
+# --- Duplicate Activity Detection ---
+# Exact duplicates (every key column identical, e.g. the same workout uploaded from both a watch and a phone) are
+# dropped before scoring. Near-duplicates are only reported for review: the workbook has no time of day, so two
+# short same-day sessions such as a warm-up and a cool-down run can look alike without being copies of each other.
+# Two rows are near-duplicates when they are the same participant and Workout Type on the same day, and their
+# duration, distance, elevation and total zone-minute difference agree within these relative tolerances.
+DUPLICATE_TOLERANCES = {"duration_pct": 0.05, "distance_pct": 0.05, "elevation_pct": 0.10, "zones_pct": 0.10}
+DUPLICATE_WINDOW = 3 # How many neighbouring rows (after sorting) each activity is compared with
+DUPLICATE_KEY_COLUMNS = ["Participant", "Date", "Workout Type", "Total Duration", "Total Distance", "Total Elevation"] + ZONE_COLUMNS
+
+def find_duplicate_activities(df, tolerances=DUPLICATE_TOLERANCES, window=DUPLICATE_WINDOW):
+    """
+    Flags duplicate activities. Exact duplicates are found by hashing the key columns (the first row in the
+    workbook is kept); near-duplicates by sorting on participant, day, workout type and duration and comparing
+    each row with its next few neighbours, so the cost is a sort plus O(n * window) vectorized comparisons.
+    A near-duplicate always points at a row that is not flagged itself, so matches can't chain (A ~ B ~ C only
+    flags C if C is also close to A).
+    Returns (drop_mask aligned to df.index, True for exact duplicates only, report DataFrame of every flagged row
+    with "Duplicate Type" ("exact" = dropped, "near" = kept for review) and "Duplicate Of").
+    """
+    report_cols = ["Duplicate Type", "Duplicate Of"]
+    if df.empty or not {"Participant", "Date"}.issubset(df.columns):
+        return pd.Series(False, index=df.index), pd.DataFrame(columns=list(df.columns) + report_cols)
+
+    def numeric(col):
+        return pd.to_numeric(df[col], errors='coerce').fillna(0).to_numpy(dtype=np.float64) if col in df.columns else np.zeros(len(df))
+
+    key_cols = [c for c in DUPLICATE_KEY_COLUMNS if c in df.columns]
+    row_hash = pd.util.hash_pandas_object(df[key_cols], index=False).to_numpy()
+    duration, distance, elevation = numeric("Total Duration"), numeric("Total Distance"), numeric("Total Elevation")
+    zones = np.column_stack([numeric(c) for c in ZONE_COLUMNS])
+    group = pd.DataFrame({
+        "Participant": df["Participant"].astype(str), "Day": pd.to_datetime(df["Date"], errors='coerce').dt.normalize(),
+    })
+    if "Workout Type" in df.columns:
+        group["Workout Type"] = df["Workout Type"].astype(str).str.strip().str.lower()
+    group_hash = pd.util.hash_pandas_object(group, index=False).to_numpy()
+
+    # Sort so duplicates end up next to each other, longest recording first within each participant-day
+    original_position = df.index.argsort().argsort() # Ties keep the row that came first in the workbook
+    order = np.lexsort((original_position, -distance, -duration, group_hash))
+    n = len(order)
+    positions = np.arange(n)
+    duplicate_of = np.full(n, -1)
+
+    # Exact: every row after the first with the same key hash (hash equality is transitive, so no chains)
+    _, first_index, inverse = np.unique(row_hash[order], return_index=True, return_inverse=True)
+    first_of_hash = first_index[inverse.ravel()]
+    exact = first_of_hash != positions
+    duplicate_of[exact] = order[first_of_hash[exact]]
+
+    # Near: close[k, lag] is True when sorted row k is within tolerance of sorted row k - lag
+    g, d, m, e, z = group_hash[order], duration[order], distance[order], elevation[order], zones[order]
+    def within(values, pct, lag):
+        return np.abs(values[lag:] - values[:-lag]) <= pct * np.maximum(values[lag:], values[:-lag])
+
+    close = np.zeros((n, window + 1), dtype=bool)
+    for lag in range(1, min(window, n - 1) + 1):
+        zones_close = np.abs(z[lag:] - z[:-lag]).sum(axis=1) <= tolerances["zones_pct"] * np.maximum(d[lag:], d[:-lag])
+        close[lag:, lag] = (
+            (g[lag:] == g[:-lag]) & ~exact[lag:] & ~exact[:-lag] & zones_close & within(d, tolerances["duration_pct"], lag)
+            & within(m, tolerances["distance_pct"], lag) & within(e, tolerances["elevation_pct"], lag)
+        )
+
+    # Resolve in sorted order so each near-duplicate points at an unflagged row (only runs over the few candidates)
+    flagged = exact.copy()
+    for k in np.flatnonzero(close.any(axis=1)):
+        for lag in np.flatnonzero(close[k]):
+            if not flagged[k - lag]:
+                flagged[k] = True
+                duplicate_of[k] = order[k - lag]
+                break
+
+    drop_mask = pd.Series(False, index=df.index)
+    drop_mask.iloc[order[exact]] = True
+    report = df.iloc[order[flagged]].copy()
+    report["Duplicate Type"] = np.where(exact[flagged], "exact", "near")
+    report["Duplicate Of"] = df.index[duplicate_of[flagged]]
+    return drop_mask, report.sort_index()
+
+# --- Data Preprocessing Function ---
+def preprocess_data(df):
+    """
+    Cleans, processes, and prepares the weekly data DataFrame.
+    Returns (processed DataFrame, duplicate report from find_duplicate_activities with "Row" and "Duplicate Of" as
+    Excel row numbers in the workbook).
+    """
+    if df is None or df.empty:
+        print("Cannot preprocess data: Input DataFrame is None or empty.")
+        # Return an empty DataFrame with expected columns to prevent downstream errors
+        expected_cols = ["Date", "Participant", "Workout Type", "Total Duration", "Total Distance",
+                         "Zone 1", "Zone 2", "Zone 3", "Zone 4", "Zone 5", "Points", "Week"]
+        return pd.DataFrame(columns=expected_cols), pd.DataFrame()
+
+    print("Starting Data Preprocessing...")
+    processed_df = df.copy() # Work on a copy
+
+    # === Date Handling ===
+    if "Date" in processed_df.columns:
+        print("Processing 'Date' column...")
+        processed_df["Date"] = pd.to_datetime(processed_df["Date"], errors='coerce')
+        initial_rows = len(processed_df)
+        processed_df.dropna(subset=["Date"], inplace=True)
+        rows_dropped = initial_rows - len(processed_df)
+        if rows_dropped > 0:
+            print(f"Dropped {rows_dropped} rows due to invalid dates.")
+        # Sort by Date (most recent first) right after cleaning
+        processed_df = processed_df.sort_values(by="Date", ascending=False)
+        print("'Date' column processed and sorted.")
+    else:
+        print("Warning: 'Date' column not found.")
+        # Consider adding a placeholder or stopping if Date is crucial for your logic
+
+    # === Zone Handling ===
+    print("Processing Zone columns...")
+    for col in ZONE_COLUMNS:
+        if col not in processed_df.columns:
+            processed_df[col] = 0 # Add missing zone columns if necessary
+            print(f"Warning: Column '{col}' missing, added with zeros.")
+        else:
+            # Convert to numeric, coerce errors to NaN, then fill NaN with 0
+            processed_df[col] = pd.to_numeric(processed_df[col], errors='coerce').fillna(0)
+    print("Zone columns processed.")
+
+    # === Duplicate Activities ===
+    # Drop exact double uploads before scoring so they can't double-count Points. Near-duplicates stay in the data
+    # and only appear in the report, for an organizer to check against Strava
+    print("Checking for duplicate activities...")
+    drop_mask, duplicate_report = find_duplicate_activities(processed_df)
+    if drop_mask.any():
+        processed_df = processed_df[~drop_mask]
+        print(f"Dropped {int(drop_mask.sum())} exact duplicate activities.")
+    near_count = int((duplicate_report["Duplicate Type"] == "near").sum())
+    if near_count:
+        print(f"Flagged {near_count} possible near-duplicate activities for review (kept).")
+    # Labels are read_excel's 0-based positions; +2 skips the header row so "Row"/"Duplicate Of" match Excel's row numbers
+    duplicate_report["Duplicate Of"] = duplicate_report["Duplicate Of"] + 2
+    duplicate_report.index = duplicate_report.index + 2
+    duplicate_report = duplicate_report.rename_axis("Row").reset_index()
+
+    # === Points Calculation ===
+    print("Calculating 'Points' column...")
+    # Score with the active rule set (adds/updates 'Points' column at the end)
+    try:
+        processed_df["Points"] = score_activities(processed_df, {"Points": DEFAULT_SCORING_RULES})["Points"]
+        print("'Points' column calculated.")
+    except Exception as e:
+        print(f"ERROR calculating 'Points' column: {e}. 'Points' column may be incorrect or missing.")
+        processed_df["Points"] = 0 # Set to 0 as a fallback if calculation fails
+
+    print(f"Columns AFTER Points calculation: {processed_df.columns.tolist()}") # DEBUG
+
+    # === Other Numeric Columns ===
+    numeric_cols = ["Total Distance", "Total Duration", "Week"]
+    print("Processing other numeric columns...")
+    for col in numeric_cols:
+         if col in processed_df.columns:
+              # Convert to numeric, coerce errors to NaN (will be handled later if needed, e.g., fillna(0) before sum)
+              processed_df[col] = pd.to_numeric(processed_df[col], errors='coerce')
+         else:
+              print(f"Warning: Numeric column '{col}' not found.")
+    print("Other numeric columns processed.")
+
+    # === ** COLUMN REORDERING LOGIC ** ===
+    # This section ensures 'Points' is positioned correctly after 'Zone 5' if both exist.
+    print("Attempting final column reordering...")
+    current_cols = processed_df.columns.tolist()
+    # Define the ideal start of the order
+    ideal_start_order = [
+        "Date", "Participant", "Workout Type", "Total Duration", "Total Distance",
+        "Zone 1", "Zone 2", "Zone 3", "Zone 4", "Zone 5", "Points", "Week"
+    ]
+    # Create the final list: start with ideal columns found, then add the rest
+    final_ordered_cols = [col for col in ideal_start_order if col in current_cols]
+    remaining_cols = [col for col in current_cols if col not in final_ordered_cols]
+    final_ordered_cols.extend(remaining_cols) # Add any other columns to the end
+
+    try:
+        processed_df = processed_df[final_ordered_cols] # Reindex DataFrame with the new order
+        print(f"Columns successfully reordered: {processed_df.columns.tolist()}")
+    except KeyError as e:
+        print(f"KeyError during column reordering: {e}. This likely means a column in 'final_ordered_cols' doesn't exist in the DataFrame. Keeping previous order.")
+        # If reordering fails, keep the order from before this step
+    except Exception as e:
+        print(f"ERROR during column reordering: {e}. Keeping previous order.")
+        # If reordering fails for other reasons, keep the order
+    # === ** END OF COLUMN REORDERING LOGIC ** ===
+
+
+    print("Data preprocessing complete.")
+    return processed_df, duplicate_report
+
+# --- Data Compaction Function ---
+def compact_weekly_data(df):
+    """
+    Downcasts numeric columns to the smallest lossless dtype (int16/int32/float32)
+    and converts the repeated string columns to categoricals.
+    Returns the compacted DataFrame and a per-column memory footprint report (bytes).
+    """
+    report_cols = ["Column", "Dtype Before", "Dtype After", "Bytes Before", "Bytes After"]
+    if df is None or df.empty:
+        return df, pd.DataFrame(columns=report_cols)
+
+    print("Compacting weekly data dtypes...")
+    compact_df = df.copy()
+    bytes_before = df.memory_usage(deep=True, index=False)
+
+    for col in compact_df.columns:
+        series = compact_df[col]
+        try:
+            if col in ("Participant", "Workout Type"):
+                compact_df[col] = series.astype("category")
+            elif pd.api.types.is_bool_dtype(series) or not pd.api.types.is_numeric_dtype(series):
+                continue # Leave dates, flags and free-text columns as they are
+            elif series.notna().all() and (series == series.round()).all():
+                # Whole numbers with no gaps -> smallest integer type that holds them (int16 floor so
+                # zone minutes * weight arithmetic downstream cannot overflow)
+                downcast = pd.to_numeric(series, downcast="integer")
+                compact_df[col] = downcast.astype("int16") if downcast.dtype.itemsize < 2 else downcast
+            else:
+                # Only take float32 if every value survives the round trip unchanged
+                as_float32 = series.astype("float32")
+                if as_float32.astype(series.dtype).equals(series):
+                    compact_df[col] = as_float32
+        except Exception as e:
+            print(f"Could not compact column '{col}': {e}. Keeping {series.dtype}.")
+
+    bytes_after = compact_df.memory_usage(deep=True, index=False)
+    memory_report = pd.DataFrame({
+        "Column": df.columns,
+        "Dtype Before": [str(df[c].dtype) for c in df.columns],
+        "Dtype After": [str(compact_df[c].dtype) for c in df.columns],
+        "Bytes Before": bytes_before.values,
+        "Bytes After": bytes_after.values,
+    })
+    memory_report.loc[len(memory_report)] = ["Total", "", "", int(bytes_before.sum()), int(bytes_after.sum())]
+    print(f"Compaction complete: {bytes_before.sum():,} -> {bytes_after.sum():,} bytes.")
+    return compact_df, memory_report
+
+def compute_data_version(df):
+    """Content hash of the scoreboard; changes only when the data itself changes."""
+    return hashlib.sha1(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes()).hexdigest()[:12]
+
+def load_scoreboard(url=DATA_URL):
+    """
+    Downloads, preprocesses and compacts the scoreboard in one go.
+    Returns (weekly_data, memory_report, duplicate_report, data_version). Network and parse errors propagate to the caller.
+    """
+    weekly_data, duplicate_report = preprocess_data(fetch_weekly_data(url)) # weekly_data is now the cleaned DataFrame
+    weekly_data, memory_report = compact_weekly_data(weekly_data) # Downcast dtypes to keep the footprint small
+    return weekly_data, memory_report, duplicate_report, compute_data_version(weekly_data)
+
+# --- Leaderboard Functions ---
+def build_weekly_points_matrix(data, total_weeks):
+    """Builds the (participant x week) points matrix, one column per competition week (1..total_weeks)."""
+    weeks = pd.to_numeric(data["Week"], errors='coerce')
+    points = pd.to_numeric(data["Points"], errors='coerce').fillna(0)
+    points_matrix = points.groupby([data["Participant"], weeks], observed=True).sum().unstack(fill_value=0)
+    return points_matrix.reindex(columns=range(1, total_weeks + 1), fill_value=0).astype(float)
+
+def calculate_leaderboard(data, total_weeks):
+    """Calculates the main competition leaderboard."""
+    required_cols = ["Participant", "Points", "Week"]
+    if data is None or data.empty or not all(c in data.columns for c in required_cols):
+         print(f"Leaderboard calculation skipped: Missing required columns {required_cols}")
+         return pd.DataFrame(columns=["Rank", "Participant", "Points", "Points Behind"])
+
+    # Ensure Points is numeric before grouping
+    data['Points'] = pd.to_numeric(data['Points'], errors='coerce').fillna(0)
+    leaderboard = data.groupby("Participant", observed=True)["Points"].sum().reset_index().sort_values(by="Points", ascending=False)
+
+    if not leaderboard.empty:
+        max_points = leaderboard["Points"].iloc[0]
+        leaderboard["Points Behind"] = max_points - leaderboard["Points"]
+    else:
+        leaderboard["Points Behind"] = 0 # Handle empty leaderboard case
+
+    leaderboard.reset_index(drop=True, inplace=True)
+    leaderboard.insert(0, 'Rank', leaderboard.index + 1)
+
+    # Move 'Points Behind' column
+    if "Points Behind" in leaderboard.columns:
+        try:
+            points_idx = leaderboard.columns.get_loc("Points")
+            points_behind_col = leaderboard.pop("Points Behind")
+            leaderboard.insert(points_idx + 1, "Points Behind", points_behind_col)
+        except Exception as e:
+             print(f"Error moving 'Points Behind' column: {e}") # Log error, continue
+
+    # Add weekly totals from the (participant x week) points matrix, aligned to leaderboard order
+    weekly_points = build_weekly_points_matrix(data, total_weeks).reindex(leaderboard["Participant"]).fillna(0)
+    for week_num in range(1, total_weeks + 1):
+        leaderboard[f"Week {week_num} Totals"] = weekly_points[week_num].to_numpy().astype(int)
+
+    return leaderboard
+
+def calculate_rank_history(points_matrix):
+    """
+    Computes every participant's cumulative rank at the end of each week from the (participant x week)
+    points matrix: one cumulative sum across weeks, then one rank per week column (1 = leader, ties share a rank).
+    Returns the rank table and the cumulative points table, both (participant x week).
+    """
+    cumulative_points = points_matrix.cumsum(axis=1)
+    rank_history = cumulative_points.rank(axis=0, ascending=False, method="min").astype(int)
+    return rank_history, cumulative_points
+
+def calculate_head_to_head(points_matrix):
+    """
+    Head-to-head record for every pair of participants from the (participant x week) points matrix, as one
+    broadcast (participants x participants x weeks) comparison. Participants are ordered by total points.
+    Returns (weeks_won, point_margin): weeks_won[a, b] is how many weeks a out-scored b, and
+    point_margin[a, b] is a's cumulative points minus b's.
+    """
+    if points_matrix is None or points_matrix.empty:
+        return pd.DataFrame(), pd.DataFrame()
+    totals = points_matrix.sum(axis=1)
+    ordered = points_matrix.loc[totals.sort_values(ascending=False, kind="stable").index]
+    points = ordered.to_numpy(dtype=np.float64)
+    participants = ordered.index.astype(str)
+    weeks_won = (points[:, None, :] > points[None, :, :]).sum(axis=2)
+    cumulative = points.sum(axis=1)
+    point_margin = cumulative[:, None] - cumulative[None, :]
+    return (pd.DataFrame(weeks_won, index=participants, columns=participants),
+            pd.DataFrame(point_margin, index=participants, columns=participants))
+
+def summarize_running_totals(data):
+    """
+    Totals running distance and duration per participant with average pace, melted into the long
+    (Participant, Metric) layout used by the Top Runners chart. Returns an empty DataFrame if there are no runs.
+    """
+    run_data = data[data["Workout Type"].str.contains("Run", case=False, na=False)].copy()
+    # Ensure required columns are numeric BEFORE filtering/grouping
+    run_data["Total Distance"] = pd.to_numeric(run_data["Total Distance"], errors='coerce').fillna(0)
+    run_data["Total Duration"] = pd.to_numeric(run_data["Total Duration"], errors='coerce').fillna(0)
+    if run_data.empty:
+        return pd.DataFrame()
+
+    distance_data = run_data.groupby("Participant", observed=True)["Total Distance"].sum().reset_index()
+    duration_data = run_data.groupby("Participant", observed=True)["Total Duration"].sum().reset_index()
+    combined_data = pd.merge(distance_data, duration_data, on="Participant", how="left") # Keep all participants with distance
+
+    # Calculate Pace safely
+    combined_data["Pace_Value"] = combined_data.apply(
+        lambda row: row["Total Duration"] / row["Total Distance"] if row["Total Distance"] > 0 else 0, axis=1
+    )
+    combined_data["Pace_Text"] = combined_data["Pace_Value"].apply(
+        lambda x: f"{int(x)}:{int((x % 1) * 60):02d} min/mi" if x > 0 else "N/A"
+    )
+
+    combined_data = combined_data.sort_values(by="Total Distance", ascending=True) # Ascending for horizontal bar chart
+
+    # Prepare data for Plotly (melt)
+    melted_data = combined_data.melt(
+        id_vars=["Participant", "Pace_Text"],
+        value_vars=["Total Distance", "Total Duration"],
+        var_name="Metric", value_name="Value"
+    )
+    # Create display columns
+    melted_data['Display Value'] = melted_data.apply(lambda row: row['Value'] / 60 if row['Metric'] == 'Total Duration' else row['Value'], axis=1)
+    melted_data['Metric Label'] = melted_data['Metric'].replace({"Total Distance": "Distance (miles)", "Total Duration": "Duration (hours)"})
+    return melted_data
+
+def summarize_participant_totals(data):
+    """Totals duration and each zone's minutes per participant (the basis for the 'vs group average' comparisons)."""
+    total_cols = [c for c in ["Total Duration"] + ZONE_COLUMNS if c in data.columns]
+    totals = data[["Participant"] + total_cols].copy()
+    for col in total_cols:
+        totals[col] = pd.to_numeric(totals[col], errors='coerce').fillna(0)
+    return totals.groupby("Participant", observed=True)[total_cols].sum()
+
+def summarize_weekly_running_distance(data):
+    """Total group miles run per competition week (rows without a valid Week or Date are ignored)."""
+    running_data_group = data[data["Workout Type"].str.contains("Run", case=False, na=False)].copy()
+    running_data_group['Week'] = pd.to_numeric(running_data_group['Week'], errors='coerce')
+    running_data_group['Total Distance'] = pd.to_numeric(running_data_group['Total Distance'], errors='coerce').fillna(0)
+    running_data_group['Date'] = pd.to_datetime(running_data_group['Date'], errors='coerce')
+    running_data_group.dropna(subset=['Week', 'Date'], inplace=True)
+    return running_data_group.groupby("Week")["Total Distance"].sum().reset_index().sort_values("Week")
+
+# --- Individual Summaries ---
+def summarize_zone_comparison(individual_data, participant_totals, participant):
+    """Minutes per zone for one participant next to the group average (participant_totals from summarize_participant_totals)."""
+    participant_zones = individual_data[ZONE_COLUMNS].apply(pd.to_numeric, errors='coerce').fillna(0).sum()
+    group_zone_totals = participant_totals[ZONE_COLUMNS]
+    group_avg_zones = group_zone_totals.mean() if not group_zone_totals.empty else pd.Series(0, index=ZONE_COLUMNS)
+    return pd.DataFrame({ "Zone": ZONE_COLUMNS, f"{participant}": participant_zones.values, "Group Average": group_avg_zones.values }).fillna(0)
+
+def summarize_cumulative_points(individual_data):
+    """One participant's cumulative points at the end of each week they logged activity."""
+    weeks = pd.to_numeric(individual_data['Week'], errors='coerce')
+    points = pd.to_numeric(individual_data['Points'], errors='coerce').fillna(0)
+    weekly_points = points[weeks.notna()].groupby(weeks[weeks.notna()]).sum().sort_index()
+    return weekly_points.cumsum().rename_axis("Week").rename("Points").reset_index()
+
+def summarize_activity_breakdown(individual_data):
+    """Returns (activity_counts, activity_duration): one participant's activities per Workout Type, by count and by minutes."""
+    activity_counts = individual_data['Workout Type'].dropna().value_counts().reset_index()
+    activity_counts.columns = ['Workout Type', 'Count']
+    activity_counts = activity_counts[activity_counts['Count'] > 0] # Categorical dtype also lists unused types
+    durations = individual_data[['Workout Type']].assign(**{'Total Duration': pd.to_numeric(individual_data['Total Duration'], errors='coerce').fillna(0)})
+    activity_duration = durations.dropna(subset=['Workout Type']).groupby('Workout Type', observed=True)['Total Duration'].sum().reset_index()
+    activity_duration = activity_duration[activity_duration['Total Duration'] > 0]
+    return activity_counts, activity_duration
+
+# --- Group Distribution Sketches ---
+DISTRIBUTION_METRICS = ["Total Duration"] + ZONE_COLUMNS + ["Points", "Run Distance"]
+DISTRIBUTION_QUANTILES = [0.10, 0.25, 0.50, 0.75, 0.90]
+
+def build_distribution_sketches(data):
+    """
+    Per-participant totals for each metric in DISTRIBUTION_METRICS, summarized once per data version so a
+    participant view is a lookup instead of a group-wide groupby. Returns a dict with:
+      "values":      participants x metrics totals
+      "percentiles": participants x metrics percentile rank (share of the group at or below, 0-100)
+      "summary":     metrics x (Mean, Std, Min, P10..P90, Max, Participants)
+    """
+    if data is None or data.empty or "Participant" not in data.columns:
+        empty = pd.DataFrame()
+        return {"values": empty, "percentiles": empty, "summary": empty}
+    totals = summarize_participant_totals(data)
+    participants = data["Participant"]
+    if "Points" in data.columns:
+        totals["Points"] = pd.to_numeric(data["Points"], errors='coerce').fillna(0).groupby(participants, observed=True).sum()
+    if {"Total Distance", "Workout Type"}.issubset(data.columns):
+        is_run = data["Workout Type"].str.contains("Run", case=False, na=False)
+        distance = pd.to_numeric(data["Total Distance"], errors='coerce').fillna(0)
+        totals["Run Distance"] = distance.where(is_run, 0).groupby(participants, observed=True).sum()
+    values = totals[[m for m in DISTRIBUTION_METRICS if m in totals.columns]].astype(np.float64)
+    values.index = values.index.astype(str)
+
+    percentiles = values.rank(method="max", pct=True) * 100
+    quantiles = values.quantile(DISTRIBUTION_QUANTILES).T
+    quantiles.columns = [f"P{int(q * 100)}" for q in DISTRIBUTION_QUANTILES]
+    summary = pd.concat([
+        values.mean().rename("Mean"), values.std(ddof=0).rename("Std"), values.min().rename("Min"),
+        quantiles, values.max().rename("Max"), values.count().rename("Participants"),
+    ], axis=1)
+    return {"values": values, "percentiles": percentiles, "summary": summary}
+
+def lookup_participant_distribution(sketches, participant):
+    """One participant's total, percentile rank and the group spread for every sketched metric (empty if unknown)."""
+    values = sketches["values"]
+    if values.empty or str(participant) not in values.index:
+        return pd.DataFrame()
+    summary = sketches["summary"]
+    return pd.DataFrame({
+        "Metric": values.columns,
+        "Value": values.loc[str(participant)].to_numpy(),
+        "Percentile": sketches["percentiles"].loc[str(participant)].to_numpy(),
+        "Group Median": summary["P50"].to_numpy(),
+        "Group Mean": summary["Mean"].to_numpy(),
+        "Middle 50%": [f"{low:,.0f} - {high:,.0f}" for low, high in zip(summary["P25"], summary["P75"])],
+    })
+
+# --- Standings Projection Function ---
+PROJECTION_PRIOR_WEEKS = 3 # How many weeks of evidence the pooled group variance counts for when shrinking
+
+def fit_weekly_points(history, prior_weeks=PROJECTION_PRIOR_WEEKS):
+    """
+    Per-participant normal model of weekly points from a (participants x completed weeks) array.
+    The mean is each participant's own average; the variance is their own sample variance shrunk toward
+    the pooled group variance, weighted by weeks played, so one or two weeks still give a sensible spread.
+    Returns (means, standard deviations).
+    """
+    n_history = history.shape[1]
+    means = history.mean(axis=1)
+    own_variance = history.var(axis=1, ddof=1) if n_history > 1 else np.zeros(len(history))
+    pooled_variance = own_variance.mean() if n_history > 1 else history.var()
+    if n_history <= 1 or pooled_variance == 0:
+        pooled_variance = history.var() # Across everyone's weeks; the only spread estimate with a single week
+    shrunk_variance = ((n_history - 1) * own_variance + prior_weeks * pooled_variance) / (n_history - 1 + prior_weeks)
+    return means, np.sqrt(shrunk_variance)
+
+def project_final_standings(points_matrix, weeks_completed, weeks_remaining, n_trials=20000, seed=None):
+    """
+    Monte Carlo projection of the final standings.
+    Each participant's remaining weekly points are drawn from fit_weekly_points (floored at zero), and all
+    trials are simulated at once as a (trials x participants) array, one remaining week at a time.
+    weeks_remaining may be fractional to account for the unfinished part of the current week.
+    Ties share the win and get the average of the tied ranks.
+    Returns Win Probability and Expected Final Rank per participant.
+    """
+    result_cols = ["Participant", "Current Points", "Projected Points", "Win Probability", "Expected Final Rank"]
+    if points_matrix is None or points_matrix.empty:
+        return pd.DataFrame(columns=result_cols)
+
+    banked = points_matrix.sum(axis=1).to_numpy(dtype=np.float64)
+    history = points_matrix.iloc[:, :weeks_completed].to_numpy(dtype=np.float64)
+    n_participants, n_history = history.shape
+    rng = np.random.default_rng(seed)
+
+    if n_history == 0 or weeks_remaining <= 0:
+        final_points = banked[np.newaxis, :] # Nothing left to simulate (or nothing to fit)
+    else:
+        means, stds = fit_weekly_points(history)
+        final_points = np.tile(banked, (n_trials, 1))
+        full_weeks, partial_week = int(weeks_remaining), weeks_remaining - int(weeks_remaining)
+        for week_weight in [1.0] * full_weeks + ([partial_week] if partial_week > 0 else []):
+            final_points += week_weight * np.maximum(rng.normal(means, stds, size=(n_trials, n_participants)), 0)
+
+    # Average ranks within each trial (1 = most points); a tie for first splits that trial's win
+    ranks = pd.DataFrame(final_points).rank(axis=1, method="average", ascending=False).to_numpy()
+    leaders = final_points == final_points.max(axis=1, keepdims=True)
+    win_share = leaders / leaders.sum(axis=1, keepdims=True)
+
+    projection = pd.DataFrame({
+        "Participant": points_matrix.index.astype(str),
+        "Current Points": banked.round(0).astype(int),
+        "Projected Points": final_points.mean(axis=0).round(0).astype(int),
+        "Win Probability": win_share.mean(axis=0) * 100,
+        "Expected Final Rank": ranks.mean(axis=0),
+    })
+    return projection.sort_values(by=["Win Probability", "Expected Final Rank"], ascending=[False, True]).reset_index(drop=True)
+
+# --- Training Load ---
+ACUTE_WINDOW_DAYS = 7
+CHRONIC_WINDOW_DAYS = 28
+TRAINING_LOAD_METRICS = {"Points": "Points", "Duration (min)": "Total Duration"}
+
+def _day_fingerprint(day_codes, values, participants, n_days):
+    """Per-day (row count, summed load, participant-weighted checksum), used to spot the days that changed between updates."""
+    participant_weights = (pd.util.hash_pandas_object(participants, index=False).to_numpy() >> np.uint64(11)) / 2.0**53
+    return np.column_stack([
+        np.bincount(day_codes, minlength=n_days),
+        np.bincount(day_codes, weights=values, minlength=n_days),
+        np.bincount(day_codes, weights=participant_weights * (values + 1), minlength=n_days),
+    ])
+
+def _rolling_mean_from(cumulative, window, start):
+    """Trailing window mean for columns start: onward, from a running sum along the day axis (days before the first date count as rest days)."""
+    n_days = cumulative.shape[1]
+    idx = np.arange(start, n_days)
+    lagged = np.where(idx >= window, cumulative[:, np.maximum(idx - window, 0)], 0.0)
+    return (cumulative[:, idx] - lagged) / window
+
+class TrainingLoadState:
+    """
+    Acute (7-day) and chronic (28-day) average daily load per participant, plus the acute:chronic ratio.
+    Keeps a dense participant x day matrix of daily load and a per-day fingerprint of the activities behind it.
+    update() compares fingerprints to find the first day that changed, adds only the activities from that day
+    onward into the stored matrix and recomputes the running sums and rolling windows from there, so appending
+    new activities to a long history only touches the tail. A different first date or a shorter history
+    falls back to a full rebuild.
+    """
+
+    def __init__(self, value_col):
+        self.value_col = value_col
+        self.data_version = None
+        self.participants = pd.Index([])
+        self.days = pd.DatetimeIndex([])
+        self.daily = np.zeros((0, 0))
+        self.cumulative = np.zeros((0, 0))
+        self.acute = np.zeros((0, 0))
+        self.chronic = np.zeros((0, 0))
+        self.day_fingerprint = np.zeros((0, 3))
+        self.last_update_from_day = None
+        self.lock = threading.Lock()
+
+    def update(self, data, data_version=None):
+        """Brings the loads up to date with data; a no-op if data_version matches the last update."""
+        with self.lock:
+            if data_version is not None and data_version == self.data_version:
+                return
+            activity_days = pd.to_datetime(data["Date"], errors='coerce').to_numpy().astype("datetime64[D]")
+            valid = ~np.isnat(activity_days) & data["Participant"].notna().to_numpy()
+            activity_days, names = activity_days[valid], data["Participant"][valid]
+            values = pd.to_numeric(data[self.value_col], errors='coerce').fillna(0).to_numpy(dtype=np.float64)[valid]
+            if not valid.any():
+                self._recompute_from(np.zeros((0, 0)), pd.Index([]), pd.DatetimeIndex([]), 0)
+                self.day_fingerprint = np.zeros((0, 3))
+            else:
+                self._update_from_changed_day(activity_days, names, values)
+            self.data_version = data_version
+
+    def _update_from_changed_day(self, activity_days, names, values):
+        days = pd.date_range(activity_days.min(), activity_days.max(), freq="D")
+        day_codes = (activity_days - activity_days.min()).astype(np.int64)
+        fingerprint = _day_fingerprint(day_codes, values, names, len(days))
+        incremental = len(self.days) > 0 and days[0] == self.days[0] and days[-1] >= self.days[-1]
+        if incremental:
+            old_days = len(self.days)
+            changed = np.flatnonzero(~np.isclose(fingerprint[:old_days], self.day_fingerprint, rtol=1e-12, atol=0).all(axis=1))
+            start = int(changed[0]) if changed.size else old_days
+            known = self.participants
+        else:
+            start, known = 0, pd.Index([])
+        self.day_fingerprint = fingerprint
+        if start == len(days):
+            self.last_update_from_day = None # Unchanged
+            return
+
+        # Only the activities on or after the first changed day are read; new participants get appended rows
+        tail = day_codes >= start
+        tail_names = names[tail].astype(str)
+        participants = known.append(pd.Index(tail_names.unique()).difference(known))
+        daily = np.zeros((len(participants), len(days)))
+        if start > 0:
+            daily[:len(known), :start] = self.daily[:, :start]
+            if len(participants) > len(known): # New participants had no load before start
+                padding = np.zeros((len(participants) - len(known), self.cumulative.shape[1]))
+                self.cumulative, self.acute, self.chronic = (np.vstack([m, padding]) for m in (self.cumulative, self.acute, self.chronic))
+        np.add.at(daily, (participants.get_indexer(tail_names), day_codes[tail]), values[tail])
+        self._recompute_from(daily, participants, days, start)
+
+    def _recompute_from(self, daily, participants, days, start):
+        cumulative, acute, chronic = np.empty_like(daily), np.empty_like(daily), np.empty_like(daily)
+        if start > 0: # Days before start are unchanged; keep their sums and windows
+            cumulative[:, :start], acute[:, :start], chronic[:, :start] = self.cumulative[:, :start], self.acute[:, :start], self.chronic[:, :start]
+            cumulative[:, start:] = cumulative[:, start - 1:start] + np.cumsum(daily[:, start:], axis=1)
+        else:
+            cumulative[:] = np.cumsum(daily, axis=1)
+        acute[:, start:] = _rolling_mean_from(cumulative, ACUTE_WINDOW_DAYS, start)
+        chronic[:, start:] = _rolling_mean_from(cumulative, CHRONIC_WINDOW_DAYS, start)
+        self.daily, self.cumulative, self.acute, self.chronic = daily, cumulative, acute, chronic
+        self.participants, self.days = participants, days
+        self.last_update_from_day = start
+
+    def participant_series(self, participant):
+        """Daily Load, Acute Load, Chronic Load and ACWR for one participant (empty if unknown)."""
+        columns = ["Date", "Daily Load", "Acute Load", "Chronic Load", "ACWR"]
+        with self.lock:
+            if str(participant) not in self.participants:
+                return pd.DataFrame(columns=columns)
+            row = self.participants.get_loc(str(participant))
+            acute, chronic = self.acute[row], self.chronic[row]
+            series = pd.DataFrame({
+                "Date": self.days, "Daily Load": self.daily[row], "Acute Load": acute, "Chronic Load": chronic,
+                "ACWR": np.divide(acute, chronic, out=np.full_like(acute, np.nan), where=chronic > 0),
+            })
+        return series
+
+# --- Week-to-Date KPIs ---
+# Columns each KPI needs; a KPI whose columns are missing is reported as None
+WTD_KPI_COLUMNS = {
+    "running_distance": ["Week", "Total Distance", "Workout Type", "Date"],
+    "activity_count": ["Date"],
+    "points": ["Date", "Points"],
+}
+
+def get_wtd_periods(today):
+    """
+    Date ranges for the Week-to-Date comparison (Mon-Sun weeks): Monday of this week through today,
+    and the same span of days in the previous week.
+    """
+    days_into_current_week = today.weekday() # Mon=0, Sun=6
+    monday_of_current_week = today - timedelta(days=days_into_current_week)
+    prev_week_monday = monday_of_current_week - timedelta(weeks=1)
+    return {
+        "current_start": monday_of_current_week, "current_end": today,
+        "previous_start": prev_week_monday, "previous_end": prev_week_monday + timedelta(days=days_into_current_week),
+    }
+
+def calculate_pct_change(current, previous):
+    """Percentage change that treats growth from zero as +100% and zero-to-zero as no change."""
+    if previous > 0: return ((current - previous) / previous) * 100
+    elif current > 0: return 100.0 # Indicate increase from zero
+    else: return 0.0 # No change if both zero
+
+def calculate_wtd_kpis(data, today=None):
+    """
+    Calculates the three Week-to-Date KPIs (group running distance, activity count and points), each
+    compared with the same period of the previous week.
+    Returns {"started": bool, "periods": {...}, "<kpi>": {"current", "previous", "pct_change"} or None}.
+    """
+    today = today or datetime.today().date()
+    periods = get_wtd_periods(today)
+    kpis = {"started": today >= competition_start_datetime.date(), "periods": periods}
+
+    if "Date" in data.columns:
+        activity_dates = pd.to_datetime(data["Date"], errors='coerce').dt.normalize()
+        in_current = (activity_dates >= pd.Timestamp(periods["current_start"])) & (activity_dates <= pd.Timestamp(periods["current_end"]))
+        in_previous = (activity_dates >= pd.Timestamp(periods["previous_start"])) & (activity_dates <= pd.Timestamp(periods["previous_end"]))
+
+    for kpi_name, required_cols in WTD_KPI_COLUMNS.items():
+        if not all(c in data.columns for c in required_cols):
+            kpis[kpi_name] = None
+            continue
+        if kpi_name == "running_distance":
+            is_valid_run = data["Workout Type"].str.contains("Run", case=False, na=False) & pd.to_numeric(data["Week"], errors='coerce').notna()
+            values = pd.to_numeric(data["Total Distance"], errors='coerce').fillna(0).where(is_valid_run, 0)
+        elif kpi_name == "activity_count":
+            values = pd.Series(1, index=data.index)
+        else:
+            values = pd.to_numeric(data["Points"], errors='coerce').fillna(0)
+        current, previous = values[in_current].sum(), values[in_previous].sum()
+        if kpi_name == "activity_count":
+            current, previous = int(current), int(previous)
+        else:
+            current, previous = float(current), float(previous)
+        kpis[kpi_name] = {"current": current, "previous": previous, "pct_change": calculate_pct_change(current, previous)}
+
+    return kpis
+
+# --- Participant Summaries ---
+def summarize_participants(data, leaderboard):
+    """
+    One row per participant: standing (rank, points, points behind, weekly totals), activity count,
+    total duration/distance, running distance and minutes per zone. Ordered like the leaderboard.
+    """
+    if data is None or data.empty or leaderboard is None or leaderboard.empty:
+        return pd.DataFrame()
+    is_run = data["Workout Type"].str.contains("Run", case=False, na=False) if "Workout Type" in data.columns else pd.Series(False, index=data.index)
+    distance = pd.to_numeric(data["Total Distance"], errors='coerce').fillna(0) if "Total Distance" in data.columns else pd.Series(0.0, index=data.index)
+    activity_totals = pd.DataFrame({
+        "Activities": data.groupby("Participant", observed=True).size(),
+        "Total Distance": distance.groupby(data["Participant"], observed=True).sum(),
+        "Run Distance": distance.where(is_run, 0).groupby(data["Participant"], observed=True).sum(),
+    }).join(summarize_participant_totals(data))
+    activity_totals.index = activity_totals.index.astype(str)
+
+    summary = leaderboard.set_index(leaderboard["Participant"].astype(str)).drop(columns="Participant")
+    summary = summary.join(activity_totals).fillna(0)
+    return summary.rename_axis("Participant").reset_index()
+
+# --- END OF FILE scoreboard.py ---
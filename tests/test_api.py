@@ -0,0 +1,62 @@
+import pandas as pd
+import pytest
+from starlette.testclient import TestClient
+
+import api
+import scoreboard
+
+
+def fake_load_scoreboard(url=None):
+    raw = pd.DataFrame({
+        "Participant": ["Todd", "Ann", "Todd"],
+        "Date": pd.to_datetime(["2025-03-11", "2025-03-12", "2025-03-19"]),
+        "Workout Type": ["Run", "Bike", "Run"],
+        "Total Duration": [30, 60, 45], "Total Distance": [3.0, 15.0, 4.5], "Total Elevation": [10, 200, 20],
+        "Zone 1": [5, 10, 5], "Zone 2": [20, 40, 30], "Zone 3": [5, 10, 10], "Zone 4": [0, 0, 0], "Zone 5": [0, 0, 0],
+        "Week": [1, 1, 2],
+    })
+    weekly_data, duplicate_report = scoreboard.preprocess_data(raw)
+    weekly_data, memory_report = scoreboard.compact_weekly_data(weekly_data)
+    return weekly_data, memory_report, duplicate_report, scoreboard.compute_data_version(weekly_data)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(scoreboard, "load_scoreboard", fake_load_scoreboard)
+    monkeypatch.setattr(api, "state", api.ScoreboardState())
+    monkeypatch.setattr(api, "get_current_week", lambda: 2)
+    return TestClient(api.app)
+
+
+def test_responses_carry_an_etag(client):
+    response = client.get("/api/leaderboard")
+    assert response.status_code == 200
+    assert response.headers["etag"].startswith('"')
+    assert response.json()["current_week"] == 2
+
+
+@pytest.mark.parametrize("path", ["/api/leaderboard", "/api/weeks", "/api/participants", "/api/participants/todd"])
+def test_matching_if_none_match_gets_304(client, path):
+    etag = client.get(path).headers["etag"]
+    for header in [etag, f"W/{etag}", f'"stale", {etag}']:
+        response = client.get(path, headers={"If-None-Match": header})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+
+def test_unknown_participant_is_404(client):
+    response = client.get("/api/participants/nobody")
+    assert response.status_code == 404
+    assert "error" in response.json()
+
+
+def test_week_rollover_changes_the_etag(client, monkeypatch):
+    for path in ["/api/leaderboard", "/api/weeks"]:
+        etag = client.get(path).headers["etag"]
+        monkeypatch.setattr(api, "get_current_week", lambda: 3)
+        response = client.get(path, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        assert response.json()["current_week"] == 3
+        monkeypatch.setattr(api, "get_current_week", lambda: 2)
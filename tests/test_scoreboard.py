@@ -0,0 +1,144 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from scoreboard import (DEFAULT_SCORING_RULES, TrainingLoadState, find_duplicate_activities, preprocess_data,
+                        project_final_standings, score_activities)
+
+
+def make_activities(rows):
+    columns = ["Participant", "Date", "Workout Type", "Total Duration", "Total Distance", "Total Elevation",
+               "Zone 1", "Zone 2", "Zone 3", "Zone 4", "Zone 5"]
+    df = pd.DataFrame(rows, columns=columns)
+    df["Date"] = pd.to_datetime(df["Date"])
+    return df
+
+
+def test_near_duplicates_do_not_chain():
+    # 96 is within 5% of 100 and 92 is within 5% of 96, but 92 is 8% off the row that is kept
+    df = make_activities([
+        ["Todd", "2025-04-01", "Run", 100, 10.0, 100, 0, 100, 0, 0, 0],
+        ["Todd", "2025-04-01", "Run", 96, 9.6, 96, 0, 96, 0, 0, 0],
+        ["Todd", "2025-04-01", "Run", 92, 9.2, 92, 0, 92, 0, 0, 0],
+    ])
+    drop_mask, report = find_duplicate_activities(df)
+    assert not drop_mask.any() # Near-duplicates are reported, never dropped
+    assert report.index.tolist() == [1]
+    assert report["Duplicate Type"].tolist() == ["near"]
+    assert report["Duplicate Of"].tolist() == [0]
+
+
+def test_exact_duplicates_are_dropped_and_point_at_the_kept_row():
+    row = ["Todd", "2025-04-01", "Bike", 60, 15.0, 300, 5, 50, 5, 0, 0]
+    df = make_activities([row, row, row])
+    drop_mask, report = find_duplicate_activities(df)
+    assert drop_mask.tolist() == [False, True, True]
+    assert report["Duplicate Type"].tolist() == ["exact", "exact"]
+    assert report["Duplicate Of"].tolist() == [0, 0]
+
+
+def test_duplicate_report_uses_excel_row_numbers():
+    # Excel row 2 is the first activity under the header; sorting by date must not change the reported rows
+    row = ["Todd", "2025-04-01", "Bike", 60, 15.0, 300, 5, 50, 5, 0, 0]
+    df = make_activities([row, ["Todd", "2025-04-02", "Run", 30, 3.0, 20, 0, 30, 0, 0, 0], row])
+    processed, report = preprocess_data(df)
+    assert len(processed) == 2
+    assert report["Row"].tolist() == [4]
+    assert report["Duplicate Of"].tolist() == [2]
+
+
+def test_warm_up_and_cool_down_runs_are_not_duplicates():
+    # Rows 426/430 of the workbook: two short runs either side of a workout, different elevation
+    df = make_activities([
+        ["Jeremiah", "2025-04-18", "Run", 11, 1.05, 72, 1, 10, 0, 0, 0],
+        ["Jeremiah", "2025-04-18", "Workout", 63, 0.0, 0, 3, 61, 0, 0, 0],
+        ["Jeremiah", "2025-04-18", "Run", 11, 1.09, 36, 1, 10, 0, 0, 0],
+    ])
+    drop_mask, report = find_duplicate_activities(df)
+    assert not drop_mask.any()
+    assert report.empty
+
+
+def test_projection_after_one_week_is_not_all_or_nothing():
+    # A single completed week gives every participant one sample; the fitted spread must still leave the race open
+    points_matrix = pd.DataFrame({1: [1000.0, 950.0, 600.0], 2: [0.0, 0.0, 0.0]}, index=["Ann", "Bob", "Cal"])
+    projection = project_final_standings(points_matrix, weeks_completed=1, weeks_remaining=6.5, n_trials=5000, seed=0).set_index("Participant")
+    assert 0 < projection.loc["Bob", "Win Probability"] < projection.loc["Ann", "Win Probability"] < 100
+    assert projection["Win Probability"].sum() == pytest.approx(100)
+    assert not projection["Expected Final Rank"].apply(float.is_integer).all()
+
+
+def test_projection_splits_ties_after_the_final_week():
+    points_matrix = pd.DataFrame({1: [500.0, 500.0, 300.0]}, index=["Ann", "Bob", "Cal"])
+    projection = project_final_standings(points_matrix, weeks_completed=1, weeks_remaining=0).set_index("Participant")
+    assert projection.loc["Ann", "Win Probability"] == projection.loc["Bob", "Win Probability"] == 50
+    assert projection.loc["Ann", "Expected Final Rank"] == projection.loc["Bob", "Expected Final Rank"] == 1.5
+    assert projection.loc["Cal", "Expected Final Rank"] == 3
+
+
+def test_default_scoring_matches_fixed_zone_weights():
+    df = make_activities([
+        ["Todd", "2025-04-01", "Run", 60, 6.0, 50, 10, 20, 15, 10, 5],
+        ["Ann", "2025-04-01", "Bike", 30, 8.0, 80, 30, 0, 0, 0, 0],
+    ])
+    points = score_activities(df, {"Points": DEFAULT_SCORING_RULES})["Points"]
+    expected = df["Zone 1"] * 1 + df["Zone 2"] * 2 + df["Zone 3"] * 3 + df["Zone 4"] * 4 + df["Zone 5"] * 5
+    assert points.tolist() == expected.astype(float).tolist()
+
+
+def test_scoring_multipliers_bonuses_and_daily_cap():
+    df = make_activities([
+        ["Todd", "2025-04-01", "Run", 30, 3.0, 0, 0, 0, 0, 20, 10],          # 130 zone points, earns the bonus
+        ["Todd", "2025-04-01", "Weight Training", 60, 0.0, 0, 60, 0, 0, 0, 0], # 60 zone points, halved
+        ["Ann", "2025-04-01", "Run", 100, 10.0, 0, 0, 100, 0, 0, 0],          # 200 zone points, no bonus
+    ])
+    rules = {
+        "Multiplier": {**DEFAULT_SCORING_RULES, "workout_multipliers": {"Weight Training": 0.5}},
+        "Bonus": {**DEFAULT_SCORING_RULES, "bonuses": [{"zones": ["Zone 4", "Zone 5"], "min_minutes": 20, "points": 25}]},
+        "Cap": {**DEFAULT_SCORING_RULES, "daily_cap": 95},
+    }
+    scores = score_activities(df, rules)
+    assert scores["Multiplier"].tolist() == [130, 30, 200]
+    assert scores["Bonus"].tolist() == [155, 60, 200]
+    # Todd's day (190) scales down to the cap proportionally; Ann's single activity is capped at 95
+    assert scores["Cap"].tolist() == pytest.approx([65, 30, 95])
+
+
+def make_load_history(n_days=60, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp("2025-03-01") + pd.to_timedelta(rng.integers(0, n_days, 300), unit="D")
+    return pd.DataFrame({
+        "Participant": rng.choice(["Todd", "Jeremiah", "Steven"], 300),
+        "Date": dates, "Points": rng.uniform(0, 100, 300).round(1),
+    }).sort_values("Date", ignore_index=True)
+
+
+def assert_matches_full_rebuild(state, data):
+    fresh = TrainingLoadState("Points")
+    fresh.update(data)
+    for participant in fresh.participants:
+        pd.testing.assert_frame_equal(state.participant_series(participant), fresh.participant_series(participant))
+
+
+@pytest.mark.parametrize("change", ["append", "edit", "delete", "new_participant"])
+def test_incremental_training_load_matches_full_rebuild(change):
+    history = make_load_history()
+    state = TrainingLoadState("Points")
+    state.update(history, "v1")
+    if change == "append":
+        last_day = history["Date"].max()
+        data = pd.concat([history, pd.DataFrame({
+            "Participant": ["Todd", "Steven"], "Date": [last_day, last_day + pd.Timedelta(days=1)], "Points": [12.5, 40.0],
+        })], ignore_index=True)
+    elif change == "edit":
+        data = history.copy()
+        data.loc[150, "Points"] += 25
+    elif change == "delete":
+        data = history.drop(index=150)
+    else:
+        data = pd.concat([history, pd.DataFrame({
+            "Participant": ["Casey"], "Date": [history.loc[200, "Date"]], "Points": [55.0],
+        })], ignore_index=True)
+    state.update(data, "v2")
+    assert state.last_update_from_day > 0 # Took the incremental path, not a full rebuild
+    assert_matches_full_rebuild(state, data)